@@ -1,26 +1,486 @@
+import cProfile
+import hashlib
+import json
 import os
+import queue
 import shutil
+import stat as statmod
+import sys
+import threading
 import time
+import uuid
+from collections import deque
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, Set, Callable, Generator
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from fastapi import Body
+from fastapi.responses import FileResponse, StreamingResponse
 
 from app import schemas
+from app.chain.mediaserver import MediaServerChain
 from app.chain.storage import StorageChain
 from app.chain.transfer import TransferChain
 from app.core.config import settings
 from app.core.event import eventmanager, Event
+from app.db import SessionFactory
 from app.db.models.transferhistory import TransferHistory
 from app.db.transferhistory_oper import TransferHistoryOper
 from app.db.downloadhistory_oper import DownloadHistoryOper
 from app.helper.downloader import DownloaderHelper
+from app.helper.mediaserver import MediaServerHelper
 from app.log import logger
 from app.plugins import _PluginBase
 from app.schemas.types import NotificationType, EventType, MediaType, MediaImageType
+from app.utils.string import StringUtils
 from app.utils.system import SystemUtils
 
 
+class InodeIndex:
+    """
+    硬链接索引：(st_dev, st_ino) -> 共享该inode的路径
+    """
+
+    def __init__(self, roots: List[str]):
+        self.roots = roots
+        self._lock = threading.Lock()
+        self._inodes: Dict[Tuple[int, int], Set[str]] = {}
+        self._paths: Dict[str, Tuple[int, int]] = {}
+        self._building = False
+        self._cancel_event = threading.Event()
+        self.ready = False
+
+    def build(self):
+        """
+        单次os.scandir遍历建立索引，只记录存在多个硬链接的文件
+        """
+        with self._lock:
+            if self._building:
+                logger.info("硬链接索引正在建立中，跳过本次重建")
+                return
+            self._building = True
+        try:
+            self.__scan()
+        finally:
+            with self._lock:
+                self._building = False
+
+    def cancel(self):
+        """
+        取消正在进行的扫描，扫描结果丢弃
+        """
+        self._cancel_event.set()
+
+    def __scan(self):
+        inodes: Dict[Tuple[int, int], Set[str]] = {}
+        paths: Dict[str, Tuple[int, int]] = {}
+        stack = [root for root in self.roots if root and os.path.isdir(root)]
+        while stack:
+            if self._cancel_event.is_set():
+                logger.info("硬链接索引扫描已取消")
+                return
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stat = entry.stat(follow_symlinks=False)
+                                if stat.st_nlink < 2:
+                                    continue
+                                key = (stat.st_dev, stat.st_ino)
+                                inodes.setdefault(key, set()).add(entry.path)
+                                paths[entry.path] = key
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.warn(f"硬链接索引扫描 {current} 失败：{str(e)}")
+        with self._lock:
+            self._inodes = inodes
+            self._paths = paths
+            self.ready = True
+        logger.info(f"硬链接索引建立完成，共 {len(paths)} 个文件")
+
+    def add(self, path: str):
+        """
+        增量添加文件
+        """
+        try:
+            stat = os.lstat(path)
+        except OSError:
+            return
+        key = (stat.st_dev, stat.st_ino)
+        with self._lock:
+            self.__discard(path)
+            self._inodes.setdefault(key, set()).add(path)
+            self._paths[path] = key
+
+    def remove(self, path: str):
+        """
+        增量移除文件
+        """
+        with self._lock:
+            self.__discard(path)
+
+    def siblings(self, key: Tuple[int, int], exclude: Set[str] = None) -> List[str]:
+        """
+        查询共享同一inode的其它路径，顺带剔除已失效的条目
+        """
+        with self._lock:
+            candidates = list(self._inodes.get(key) or [])
+        result = []
+        for path in candidates:
+            if exclude and path in exclude:
+                continue
+            try:
+                stat = os.lstat(path)
+            except OSError:
+                self.remove(path)
+                continue
+            if (stat.st_dev, stat.st_ino) != key:
+                self.remove(path)
+                continue
+            result.append(path)
+        return result
+
+    def __discard(self, path: str):
+        key = self._paths.pop(path, None)
+        if key is None:
+            return
+        links = self._inodes.get(key)
+        if links is not None:
+            links.discard(path)
+            if not links:
+                self._inodes.pop(key, None)
+
+
+def truncate_file(file_path: Path, rate: float = 0, step: int = 1024 ** 3) -> int:
+    """
+    分步截断文件至0，按rate（字节/秒）限速，避免一次性释放大量extent造成IO抖动
+    :return: 截断的字节数
+    """
+    if rate > 0:
+        step = int(min(max(rate, 64 * 1024 ** 2), step))
+    with open(file_path, "r+b") as f:
+        size = os.fstat(f.fileno()).st_size
+        remaining = size
+        while remaining > 0:
+            start_time = time.perf_counter()
+            remaining = max(remaining - step, 0)
+            os.ftruncate(f.fileno(), remaining)
+            if rate > 0 and remaining > 0:
+                sleep_time = step / rate - (time.perf_counter() - start_time)
+                if sleep_time > 0:
+                    time.sleep(sleep_time)
+    return size
+
+
+class SizeIndex:
+    """
+    文件大小索引：转移记录的源文件、目标文件路径 -> (st_dev, st_ino, st_size)，并按(类型, TMDB ID)聚合，
+    电影与电视剧的TMDB ID编号相互独立，可能重复
+    """
+
+    def __init__(self):
+        # 是否已开始由转移记录加载
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._files: Dict[str, Tuple[int, int, int]] = {}
+        self._shows: Dict[Tuple[str, int], Set[str]] = {}
+        self._owners: Dict[str, Tuple[str, int]] = {}
+
+    def update(self, path: str, stat: os.stat_result = None, mtype: str = None,
+               tmdbid: Any = None) -> Optional[Tuple[int, int, int]]:
+        """
+        更新文件大小，未传入stat时读取一次
+        """
+        if stat is None:
+            try:
+                stat = os.lstat(path)
+            except OSError:
+                self.remove(path)
+                return None
+        info = (stat.st_dev, stat.st_ino, stat.st_size)
+        with self._lock:
+            self._files[path] = info
+            self.__set_owner(path, mtype, tmdbid)
+        return info
+
+    def get(self, path: str, mtype: str = None, tmdbid: Any = None) -> Optional[Tuple[int, int, int]]:
+        """
+        查询文件大小，未命中时读取一次并加入索引
+        """
+        with self._lock:
+            info = self._files.get(path)
+            if info is not None:
+                self.__set_owner(path, mtype, tmdbid)
+                return info
+        return self.update(path, mtype=mtype, tmdbid=tmdbid)
+
+    def remove(self, path: str):
+        """
+        移除文件
+        """
+        with self._lock:
+            self._files.pop(path, None)
+            owner = self._owners.pop(path, None)
+            if owner is not None:
+                paths = self._shows.get(owner)
+                if paths is not None:
+                    paths.discard(path)
+                    if not paths:
+                        self._shows.pop(owner, None)
+
+    def show_size(self, mtype: str, tmdbid: Any) -> int:
+        """
+        统计已索引的该类型、TMDB ID文件占用空间，硬链接只计算一次
+        """
+        if not mtype or not tmdbid or not str(tmdbid).isdigit():
+            return 0
+        with self._lock:
+            inodes = {}
+            for path in self._shows.get((mtype, int(tmdbid))) or []:
+                info = self._files.get(path)
+                if info:
+                    inodes[(info[0], info[1])] = info[2]
+        return sum(inodes.values())
+
+    def __set_owner(self, path: str, mtype: str, tmdbid: Any):
+        if not mtype or not tmdbid or not str(tmdbid).isdigit():
+            return
+        owner = (mtype, int(tmdbid))
+        previous = self._owners.get(path)
+        if previous is not None and previous != owner:
+            self._shows.get(previous, set()).discard(path)
+        self._owners[path] = owner
+        self._shows.setdefault(owner, set()).add(path)
+
+
+class MediaLock:
+    """
+    按(tmdb_id, season)加锁：同一季互斥，整部剧或电影（season为空）与该TMDB ID的所有季互斥，
+    tmdb_id为空时无法确定所属媒体，与所有删除互斥
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._holders: Set[Tuple[Any, Any]] = set()
+
+    def acquire(self, key: Tuple[Any, Any], blocking: bool = True) -> bool:
+        """
+        加锁
+        """
+        with self._cond:
+            while self.__conflict(key):
+                if not blocking:
+                    return False
+                self._cond.wait()
+            self._holders.add(key)
+            return True
+
+    def release(self, key: Tuple[Any, Any]):
+        """
+        解锁
+        """
+        with self._cond:
+            self._holders.discard(key)
+            self._cond.notify_all()
+
+    def __conflict(self, key: Tuple[Any, Any]) -> bool:
+        for tmdb_id, season in self._holders:
+            if tmdb_id is None or key[0] is None:
+                return True
+            if tmdb_id != key[0]:
+                continue
+            if season is None or key[1] is None or season == key[1]:
+                return True
+        return False
+
+
+class DeleteScheduler:
+    """
+    删除任务调度：单集、电影等交互任务优先，整季、整剧等批量任务按权重使用剩余处理能力
+    """
+
+    def __init__(self, weight: int = 4, workers: int = 1):
+        # 连续处理weight个交互任务后处理一个批量任务
+        self._weight = weight
+        self._workers = max(workers, 1)
+        self._interactive = deque()
+        self._bulk = deque()
+        self._served = 0
+        self._cond = threading.Condition()
+        self._running = False
+        # 停止后是否继续处理已排队的任务
+        self._draining = False
+        self._threads: List[threading.Thread] = []
+        self._local = threading.local()
+
+    def start(self):
+        """
+        启动调度线程
+        """
+        self._running = True
+        self._threads = [threading.Thread(target=self.__run, daemon=True) for _ in range(self._workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, drain: bool = True):
+        """
+        停止调度，不等待线程退出：drain时调度线程处理完已排队任务后退出，否则完成当前任务后退出
+        """
+        with self._cond:
+            self._running = False
+            self._draining = drain
+            pending = len(self._interactive) + len(self._bulk)
+            self._cond.notify_all()
+        if pending and drain:
+            logger.info(f"同步删除调度已停止，继续处理队列中 {pending} 个任务")
+        self._threads = []
+
+    def take_pending(self) -> List[Tuple[Tuple[Callable[..., Any], Dict[str, Any]], bool]]:
+        """
+        取出未执行的任务，用于转交新的调度器
+        :return: [(任务, 是否批量任务)]
+        """
+        with self._cond:
+            jobs = [(job, False) for job in self._interactive] + [(job, True) for job in self._bulk]
+            self._interactive.clear()
+            self._bulk.clear()
+        return jobs
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def nested(self) -> bool:
+        """
+        当前是否为批量任务让出时执行的交互任务
+        """
+        return getattr(self._local, "nested", False)
+
+    def submit(self, func: Callable[..., Any], kwargs: Dict[str, Any], bulk: bool):
+        """
+        提交任务
+        """
+        with self._cond:
+            (self._bulk if bulk else self._interactive).append((func, kwargs))
+            logger.info(f"同步删除任务已加入{'批量' if bulk else '交互'}队列，"
+                        f"当前排队 交互{len(self._interactive)} 批量{len(self._bulk)}")
+            self._cond.notify()
+
+    def yield_interactive(self):
+        """
+        批量任务执行过程中调用，先执行排队中的交互任务
+        """
+        if not getattr(self._local, "bulk", False):
+            return
+        # 只处理当前已排队的任务，重新排队的任务留待调度线程处理
+        with self._cond:
+            count = len(self._interactive)
+        self._local.nested = True
+        try:
+            while (self._running or self._draining) and count > 0:
+                with self._cond:
+                    if not self._interactive:
+                        return
+                    job = self._interactive.popleft()
+                count -= 1
+                self.__execute(job, bulk=False)
+        finally:
+            self._local.nested = False
+
+    def __next_job(self) -> Optional[Tuple[Tuple[Callable[..., Any], Dict[str, Any]], bool]]:
+        with self._cond:
+            while self._running and not self._interactive and not self._bulk:
+                self._cond.wait()
+            if not self._interactive and not self._bulk:
+                return None
+            if not self._running and not self._draining:
+                return None
+            if self._interactive and (not self._bulk or self._served < self._weight):
+                self._served += 1
+                return self._interactive.popleft(), False
+            self._served = 0
+            return self._bulk.popleft(), True
+
+    def __run(self):
+        while True:
+            task = self.__next_job()
+            if not task:
+                break
+            self.__execute(*task)
+
+    def __execute(self, job: Tuple[Callable[..., Any], Dict[str, Any]], bulk: bool):
+        outer = getattr(self._local, "bulk", False)
+        self._local.bulk = bulk
+        func, kwargs = job
+        try:
+            func(**kwargs)
+        except Exception as e:
+            logger.error(f"同步删除任务执行失败：{str(e)}")
+        finally:
+            self._local.bulk = outer
+
+
+class SamplingProfiler:
+    """
+    采样分析器：后台线程定时抓取目标线程调用栈，输出collapsed stack格式
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Dict[str, int] = {}
+        self._thread_id = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        # 调用方之上的外层栈深度，采样时裁掉
+        self._base_depth = 0
+
+    def start(self):
+        """
+        开始采样当前线程，以调用方为栈底
+        """
+        self._thread_id = threading.get_ident()
+        frame = sys._getframe(1)
+        while frame.f_back:
+            self._base_depth += 1
+            frame = frame.f_back
+        self._thread = threading.Thread(target=self.__sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        停止采样
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        """
+        输出collapsed stack，可直接用于flamegraph.pl、speedscope
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+    def __sample(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack = stack[::-1][self._base_depth:]
+            if stack:
+                key = ";".join(stack)
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+
 class MediaSyncDelEmt(_PluginBase):
     # 插件名称
     plugin_name = "EMBY同步删除"
@@ -29,7 +489,7 @@ class MediaSyncDelEmt(_PluginBase):
     # 插件图标
     plugin_icon = "mediasyncdel.png"
     # 插件版本
-    plugin_version = "1.9.9"
+    plugin_version = "2.11.0"
     # 插件作者
     plugin_author = "2691432189"
     # 作者主页
@@ -45,16 +505,61 @@ class MediaSyncDelEmt(_PluginBase):
     _scheduler: Optional[BackgroundScheduler] = None
     _enabled = False
     _sync_type: str = ""
+    _poll_cron = None
+    # 单次轮询移除比例超过该值时视为媒体库异常，不执行删除
+    _poll_max_removed_ratio = 0.2
+    # 连续多少次轮询移除相同媒体后接受为新快照
+    _poll_confirm_runs = 3
     _notify = False
     _del_source = False
     _del_history = False
     _exclude_path = None
     _library_path = None
+    # 解析后的路径映射、排除路径
+    _library_paths: List[Tuple[str, str]] = []
+    _exclude_paths: List[str] = []
     _transferchain = None
     _transferhis = None
     _downloadhis = None
     _default_downloader = None
     _storagechain = None
+    _hardlink_index = False
+    _hardlink_paths = None
+    _inode_index: Optional[InodeIndex] = None
+    _size_index: Optional[SizeIndex] = None
+    _trash_mode = False
+    _trash_retention = None
+    _purge_cron = None
+    _purge_rate = None
+    _truncate_size = None
+    _truncate_rate = None
+    # 当前线程删除统计
+    _deletion_stats = threading.local()
+    _delete_scheduler: Optional[DeleteScheduler] = None
+    _workers = None
+    _media_lock = MediaLock()
+    _history_lock = threading.Lock()
+    # 转移记录分批读取大小、删除所需字段
+    _chunk_size = 200
+    _transfer_columns = ("id", "type", "title", "year", "tmdbid", "image", "seasons", "episodes",
+                         "src", "dest", "download_hash")
+    # 历史记录中删除计划明细的最大条数
+    _plan_audit_limit = 100
+    # 批量删除任务状态：任务ID -> 状态，保留最近的任务数、流式返回等待进度的超时时间（秒）
+    _batch_jobs: Dict[str, Dict[str, Any]] = {}
+    _batch_keep = 20
+    _batch_wait = 300
+    _batch_lock = threading.Lock()
+    # 回收站目录名
+    _trash_name = ".mediasyncdel_trash"
+    # 文件系统设备号 -> 回收站目录
+    _trash_dirs: Dict[int, Path] = {}
+    _trash_lock = threading.Lock()
+    # 性能分析：剩余分析次数、慢事件阈值（毫秒）、保留文件数
+    _profile_count = 0
+    _profile_threshold = 0
+    _profile_keep = 20
+    _profile_lock = threading.Lock()
 
     def init_plugin(self, config: dict = None):
         self._transferchain = TransferChain()
@@ -67,11 +572,21 @@ class MediaSyncDelEmt(_PluginBase):
         if config:
             self._enabled = config.get("enabled")
             self._sync_type = config.get("sync_type")
+            self._poll_cron = config.get("poll_cron")
             self._notify = config.get("notify")
             self._del_source = config.get("del_source")
             self._del_history = config.get("del_history")
             self._exclude_path = config.get("exclude_path")
             self._library_path = config.get("library_path")
+            self._hardlink_index = config.get("hardlink_index")
+            self._hardlink_paths = config.get("hardlink_paths")
+            self._trash_mode = config.get("trash_mode")
+            self._trash_retention = config.get("trash_retention")
+            self._purge_cron = config.get("purge_cron")
+            self._purge_rate = config.get("purge_rate")
+            self._truncate_size = config.get("truncate_size")
+            self._truncate_rate = config.get("truncate_rate")
+            self._workers = config.get("workers")
 
             # 获取默认下载器
             downloader_services = self._downloader_helper.get_services()
@@ -81,16 +596,75 @@ class MediaSyncDelEmt(_PluginBase):
 
             # 清理插件历史
             if self._del_history:
-                self.del_data(key="history")
-                self.update_config({
-                    "enabled": self._enabled,
-                    "sync_type": self._sync_type,
-                    "notify": self._notify,
-                    "del_source": self._del_source,
-                    "del_history": False,
-                    "exclude_path": self._exclude_path,
-                    "library_path": self._library_path
-                })
+                with self._history_lock:
+                    self.del_data(key="history")
+                self._del_history = False
+                self.__update_config()
+
+        # 预先解析路径映射、排除路径，避免每次删除重复解析
+        self._library_paths = []
+        for path in (self._library_path or "").split("\n"):
+            sub_paths = path.split(":")
+            if len(sub_paths) < 2:
+                continue
+            self._library_paths.append((sub_paths[0], sub_paths[1]))
+        self._exclude_paths = [os.path.abspath(path) for path in (self._exclude_path or "").split(",") if path]
+
+        # 大小索引由转移记录加载一次，之后随整理完成事件增量更新
+        if not self._size_index:
+            self._size_index = SizeIndex()
+        if self._enabled and not self._size_index.loaded:
+            self._size_index.loaded = True
+            threading.Thread(target=self.__build_size_index, daemon=True).start()
+
+        # 建立硬链接索引，扫描目录未变化时沿用已有索引，避免每次保存配置重复全量扫描
+        roots = []
+        if self._enabled and self._del_source and self._hardlink_index and self._hardlink_paths:
+            roots = [path.strip() for path in self._hardlink_paths.split("\n") if path.strip()]
+        if self._inode_index and self._inode_index.roots != roots:
+            self._inode_index.cancel()
+            self._inode_index = None
+        if roots and not self._inode_index:
+            self._inode_index = InodeIndex(roots)
+            threading.Thread(target=self._inode_index.build, daemon=True).start()
+
+        # 启动删除任务调度，webhook事件只推送一次，排队中的任务转交新调度器，插件关闭时由原调度器处理完
+        pending = []
+        if self._delete_scheduler:
+            if self._enabled:
+                pending = self._delete_scheduler.take_pending()
+            self._delete_scheduler.stop(drain=True)
+            self._delete_scheduler = None
+        if self._enabled:
+            workers = int(self._workers) if str(self._workers or "").isdigit() else 2
+            self._delete_scheduler = DeleteScheduler(workers=workers)
+            self._delete_scheduler.start()
+            for job, bulk in pending:
+                self._delete_scheduler.submit(*job, bulk=bulk)
+
+    def __update_config(self):
+        """
+        更新配置
+        """
+        self.update_config({
+            "enabled": self._enabled,
+            "sync_type": self._sync_type,
+            "poll_cron": self._poll_cron,
+            "notify": self._notify,
+            "del_source": self._del_source,
+            "del_history": self._del_history,
+            "exclude_path": self._exclude_path,
+            "library_path": self._library_path,
+            "hardlink_index": self._hardlink_index,
+            "hardlink_paths": self._hardlink_paths,
+            "trash_mode": self._trash_mode,
+            "trash_retention": self._trash_retention,
+            "purge_cron": self._purge_cron,
+            "purge_rate": self._purge_rate,
+            "truncate_size": self._truncate_size,
+            "truncate_rate": self._truncate_rate,
+            "workers": self._workers
+        })
 
     @staticmethod
     def get_command() -> List[Dict[str, Any]]:
@@ -107,6 +681,60 @@ class MediaSyncDelEmt(_PluginBase):
                 "endpoint": self.delete_history,
                 "methods": ["GET"],
                 "summary": "删除订阅历史记录"
+            },
+            {
+                "path": "/sync_del_batch",
+                "endpoint": self.sync_del_batch,
+                "methods": ["POST"],
+                "summary": "批量同步删除"
+            },
+            {
+                "path": "/sync_del_batch_status",
+                "endpoint": self.sync_del_batch_status,
+                "methods": ["GET"],
+                "summary": "查询批量同步删除进度"
+            },
+            {
+                "path": "/poll_baseline",
+                "endpoint": self.poll_baseline,
+                "methods": ["GET"],
+                "summary": "以当前媒体库重建轮询快照"
+            },
+            {
+                "path": "/preview",
+                "endpoint": self.preview,
+                "methods": ["GET"],
+                "summary": "预览同步删除影响范围"
+            },
+            {
+                "path": "/profile",
+                "endpoint": self.profile,
+                "methods": ["GET"],
+                "summary": "开启同步删除性能分析"
+            },
+            {
+                "path": "/profiles",
+                "endpoint": self.profiles,
+                "methods": ["GET"],
+                "summary": "查询性能分析文件"
+            },
+            {
+                "path": "/profile_file",
+                "endpoint": self.profile_file,
+                "methods": ["GET"],
+                "summary": "下载性能分析文件"
+            },
+            {
+                "path": "/trash_list",
+                "endpoint": self.trash_list,
+                "methods": ["GET"],
+                "summary": "查询回收站"
+            },
+            {
+                "path": "/trash_restore",
+                "endpoint": self.trash_restore,
+                "methods": ["GET"],
+                "summary": "从回收站恢复文件"
             }
         ]
 
@@ -116,15 +744,295 @@ class MediaSyncDelEmt(_PluginBase):
         """
         if apikey != settings.API_TOKEN:
             return schemas.Response(success=False, message="API密钥错误")
-        # 历史记录
-        historys = self.get_data('history')
-        if not historys:
-            return schemas.Response(success=False, message="未找到历史记录")
-        # 删除指定记录
-        historys = [h for h in historys if h.get("unique") != key]
-        self.save_data('history', historys)
+        with self._history_lock:
+            # 历史记录
+            historys = self.get_data('history')
+            if not historys:
+                return schemas.Response(success=False, message="未找到历史记录")
+            # 删除指定记录
+            historys = [h for h in historys if h.get("unique") != key]
+            self.save_data('history', historys)
         return schemas.Response(success=True, message="删除成功")
 
+    def sync_del_batch(self, apikey: str, items: List[Dict[str, Any]] = Body(...), stream: bool = False):
+        """
+        批量同步删除，请求体为列表：[{"type", "name", "tmdb_id", "season", "episode", "path"}]
+        返回任务ID，通过/sync_del_batch_status查询进度；stream为True时逐项返回NDJSON进度
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        if not self._enabled or not self._delete_scheduler or not self._delete_scheduler.running:
+            return schemas.Response(success=False, message="插件未启用")
+        if not items:
+            return schemas.Response(success=False, message="删除列表为空")
+        job_id = uuid.uuid4().hex
+        with self._batch_lock:
+            self._batch_jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "total": len(items),
+                "results": [],
+                "summary": None,
+                "submit_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
+            }
+            for old_id in list(self._batch_jobs)[:-self._batch_keep]:
+                self._batch_jobs.pop(old_id, None)
+        progress = queue.Queue() if stream else None
+        self._delete_scheduler.submit(self.__sync_del_batch,
+                                      {"items": items, "job_id": job_id, "progress": progress}, bulk=True)
+        if not stream:
+            return schemas.Response(success=True, message="批量同步删除任务已加入队列", data={"job_id": job_id})
+
+        def iter_results():
+            yield {"job_id": job_id}
+            while True:
+                try:
+                    result = progress.get(timeout=self._batch_wait)
+                except queue.Empty:
+                    # 长时间无进度时结束响应，后续进度通过任务ID查询
+                    yield {"job_id": job_id, "status": self.__get_batch_job(job_id).get("status"),
+                           "message": "等待进度超时，请通过任务ID查询进度"}
+                    break
+                if result is None:
+                    break
+                yield result
+
+        return StreamingResponse((json.dumps(result, ensure_ascii=False) + "\n" for result in iter_results()),
+                                 media_type="application/x-ndjson")
+
+    def sync_del_batch_status(self, job_id: str, apikey: str):
+        """
+        查询批量同步删除任务进度
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        job = self.__get_batch_job(job_id)
+        if not job:
+            return schemas.Response(success=False, message="未找到批量同步删除任务")
+        return schemas.Response(success=True, data=job)
+
+    def __get_batch_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        获取批量删除任务状态快照
+        """
+        with self._batch_lock:
+            job = self._batch_jobs.get(job_id)
+            return {**job, "results": list(job["results"])} if job else {}
+
+    def __update_batch_job(self, job_id: str, progress: Optional[queue.Queue], result: Dict[str, Any] = None,
+                           **values):
+        """
+        更新批量删除任务状态，流式请求同时推送进度
+        """
+        with self._batch_lock:
+            job = self._batch_jobs.get(job_id)
+            if job is not None:
+                job.update(values)
+                if result:
+                    job["results"].append(result)
+        if progress is not None:
+            if result:
+                progress.put(result)
+            if "summary" in values:
+                progress.put({"summary": values["summary"]})
+                progress.put(None)
+
+    def __sync_del_batch(self, items: List[Dict[str, Any]], job_id: str, progress: Optional[queue.Queue] = None):
+        """
+        批量同步删除，逐项校验、删除，最后统一保存历史、发送通知
+        """
+        self.__update_batch_job(job_id, progress, status="running")
+        start_time = time.perf_counter()
+        self._deletion_stats.batch = []
+        success_cnt = 0
+        try:
+            for index, item in enumerate(items):
+                self.__yield_interactive()
+                item_start = time.perf_counter()
+                media_type = item.get("type")
+                media_name = item.get("name")
+                media_path = item.get("path")
+                tmdb_id = item.get("tmdb_id")
+                result = {"index": index, "success": False}
+                if not media_name:
+                    result["message"] = "未指定媒体名称"
+                else:
+                    result["message"] = self.__check_item(media_type=media_type,
+                                                          media_name=media_name,
+                                                          media_path=media_path,
+                                                          tmdb_id=tmdb_id)
+                if not result["message"]:
+                    try:
+                        history_item = self.__sync_del(media_type=media_type,
+                                                       media_name=media_name,
+                                                       media_path=media_path,
+                                                       tmdb_id=tmdb_id,
+                                                       season_num=item.get("season"),
+                                                       episode_num=item.get("episode"))
+                    except Exception as e:
+                        logger.error(f"{media_name} 批量同步删除失败：{str(e)}")
+                        history_item = None
+                        result["message"] = str(e)
+                    if history_item:
+                        success_cnt += 1
+                        result["success"] = True
+                        result["stats"] = history_item.get("stats")
+                    elif not result["message"]:
+                        result["message"] = "未获取到可删除数据，详见日志"
+                result["time"] = round(time.perf_counter() - item_start, 3)
+                self.__update_batch_job(job_id, progress, result=result)
+        finally:
+            history_items = self._deletion_stats.batch
+            self._deletion_stats.batch = None
+            total_time = round(time.perf_counter() - start_time, 3)
+            records = sum((h.get("stats") or {}).get("records") or 0 for h in history_items)
+            freed_bytes = sum((h.get("stats") or {}).get("freed_bytes") or 0 for h in history_items)
+            if history_items:
+                self.__save_history(history_items)
+            logger.info(f"批量同步删除完成，共 {len(items)} 项，成功 {success_cnt} 项，"
+                        f"删除记录 {records} 个，耗时 {total_time}s")
+            if self._notify and history_items:
+                self.post_message(
+                    mtype=NotificationType.Plugin,
+                    title="媒体库批量同步删除任务完成",
+                    text=f"共{len(items)}项，成功{success_cnt}项\n"
+                         f"删除记录{records}个\n"
+                         f"释放空间{StringUtils.str_filesize(freed_bytes)}\n"
+                         f"时间 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time()))}"
+                )
+            self.__update_batch_job(job_id, progress, status="done", summary={
+                "total": len(items),
+                "success": success_cnt,
+                "records": records,
+                "freed_bytes": freed_bytes,
+                "total_time": total_time,
+                "avg_time": round(total_time / len(items), 3) if items else 0
+            })
+
+    def preview(self, apikey: str, media_type: str, tmdb_id: int = None, season: str = None,
+                episode: str = None, path: str = None, media_name: str = ""):
+        """
+        预览删除影响的转移记录、文件、种子及可释放空间，由转移记录与大小索引计算，不遍历文件系统
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        media_path = self.__map_library_path(path) if path else path
+        msg, transfer_filters = self.__get_transfer_his(media_type=media_type,
+                                                        media_name=media_name,
+                                                        media_path=media_path,
+                                                        tmdb_id=tmdb_id,
+                                                        season_num=season,
+                                                        episode_num=episode)
+        if transfer_filters is None:
+            return schemas.Response(success=False, message="参数错误，无法查询转移记录")
+        records = []
+        files = {}
+        torrents = set()
+        inodes = {}
+        for transferhis in (his for chunk in self.__iter_transfer_his(transfer_filters) for his in chunk):
+            if media_name and transferhis.title not in media_name:
+                continue
+            records.append({
+                "id": transferhis.id,
+                "title": transferhis.title,
+                "season": transferhis.seasons,
+                "episode": transferhis.episodes,
+                "src": transferhis.src,
+                "dest": transferhis.dest
+            })
+            if not self._del_source or not transferhis.src \
+                    or Path(transferhis.src).suffix not in settings.RMT_MEDIAEXT:
+                continue
+            if transferhis.download_hash:
+                torrents.add(transferhis.download_hash)
+            for file_path in [transferhis.dest, transferhis.src]:
+                info = self._size_index.get(file_path, mtype=transferhis.type,
+                                            tmdbid=transferhis.tmdbid) if file_path else None
+                if not info:
+                    continue
+                files[file_path] = info[2]
+                inodes[(info[0], info[1])] = info[2]
+        return schemas.Response(success=True, message=msg, data={
+            "records": records,
+            "files": [{"path": file_path, "size": size} for file_path, size in files.items()],
+            "torrents": list(torrents),
+            "bytes": sum(inodes.values()),
+            "show_bytes": self._size_index.show_size(
+                (MediaType.MOVIE if media_type in ["Movie", "MOV"] else MediaType.TV).value, tmdb_id)
+        })
+
+    def profile(self, apikey: str, count: int = 0, threshold: float = 0):
+        """
+        开启性能分析：分析接下来count次删除（pstats+collapsed），或只采样保留耗时超过threshold毫秒的删除（collapsed），
+        均为0时关闭
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        self._profile_count = max(int(count or 0), 0)
+        self._profile_threshold = max(float(threshold or 0), 0)
+        if not self._profile_count and not self._profile_threshold:
+            return schemas.Response(success=True, message="性能分析已关闭")
+        return schemas.Response(success=True,
+                                message=f"性能分析已开启，次数：{self._profile_count}，阈值：{self._profile_threshold}ms")
+
+    def profiles(self, apikey: str):
+        """
+        查询性能分析文件
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        files = sorted(self.__get_profile_path().glob("*.*"), key=lambda f: f.stat().st_mtime, reverse=True)
+        return schemas.Response(success=True, data=[{
+            "name": f.name,
+            "size": f.stat().st_size,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(f.stat().st_mtime))
+        } for f in files])
+
+    def profile_file(self, name: str, apikey: str):
+        """
+        下载性能分析文件
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        file_path = self.__get_profile_path() / Path(name).name
+        if not name or not file_path.is_file():
+            return schemas.Response(success=False, message="文件不存在")
+        return FileResponse(file_path, filename=file_path.name)
+
+    def trash_list(self, apikey: str):
+        """
+        查询回收站
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        return schemas.Response(success=True, data=self.get_data('trash') or [])
+
+    def trash_restore(self, key: str, apikey: str):
+        """
+        从回收站恢复文件到原路径，仅恢复文件：转移记录已删除、下载器助手已收到删除通知，不会随之恢复
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        with self._trash_lock:
+            trash = self.get_data('trash') or []
+            item = next((t for t in trash if t.get("id") == key), None)
+            if not item:
+                return schemas.Response(success=False, message="未找到回收站记录")
+            src_path = Path(item.get("path"))
+            if src_path.exists():
+                return schemas.Response(success=False, message=f"原路径 {src_path} 已存在")
+            try:
+                src_path.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(item.get("trash"), src_path)
+            except OSError as e:
+                return schemas.Response(success=False, message=f"恢复失败：{str(e)}")
+            self.save_data('trash', [t for t in trash if t.get("id") != key])
+        if self._inode_index and not item.get("is_dir"):
+            self._inode_index.add(str(src_path))
+        logger.info(f"回收站文件 {item.get('trash')} 已恢复至 {src_path}，转移记录、下载任务未恢复")
+        return schemas.Response(success=True, message="文件已恢复，转移记录及下载任务不会恢复，请重新整理",
+                                data={"path": str(src_path), "files_only": True})
+
     def get_service(self) -> List[Dict[str, Any]]:
         """
         注册插件公共服务
@@ -136,7 +1044,24 @@ class MediaSyncDelEmt(_PluginBase):
             "kwargs": {} # 定时器参数
         }]
         """
-        return []
+        services = []
+        if self._enabled and str(self._sync_type) == "poll" and self._poll_cron:
+            services.append({
+                "id": "MediaSyncDelEmtPoll",
+                "name": "轮询媒体库同步删除",
+                "trigger": CronTrigger.from_crontab(self._poll_cron),
+                "func": self.poll_library,
+                "kwargs": {}
+            })
+        if self._enabled and self._trash_mode and self._purge_cron:
+            services.append({
+                "id": "MediaSyncDelEmtPurge",
+                "name": "清空同步删除回收站",
+                "trigger": CronTrigger.from_crontab(self._purge_cron),
+                "func": self.purge_trash,
+                "kwargs": {}
+            })
+        return services
 
     def get_form(self) -> Tuple[List[dict], Dict[str, Any]]:
         """
@@ -232,7 +1157,8 @@ class MediaSyncDelEmt(_PluginBase):
                                             'label': '媒体库同步方式',
                                             'items': [
                                                 {'title': 'Webhook', 'value': 'webhook'},
-                                                {'title': 'Scripter X', 'value': 'plugin'}
+                                                {'title': 'Scripter X', 'value': 'plugin'},
+                                                {'title': '定时轮询', 'value': 'poll'}
                                             ]
                                         }
                                     }
@@ -242,36 +1168,220 @@ class MediaSyncDelEmt(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 8
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VCronField',
+                                        'props': {
+                                            'model': 'poll_cron',
+                                            'label': '轮询周期',
+                                            'placeholder': '*/30 * * * *'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'exclude_path',
+                                            'label': '排除路径'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextarea',
+                                        'props': {
+                                            'model': 'library_path',
+                                            'rows': '2',
+                                            'label': '媒体库路径映射',
+                                            'placeholder': '媒体服务器路径:MoviePilot路径（一行一个）'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'hardlink_index',
+                                            'label': '清理其他硬链接',
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 9
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextarea',
+                                        'props': {
+                                            'model': 'hardlink_paths',
+                                            'rows': '2',
+                                            'label': '硬链接扫描目录',
+                                            'placeholder': '媒体库、下载目录（一行一个）'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'trash_mode',
+                                            'label': '回收站模式',
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'trash_retention',
+                                            'label': '保留时间（小时）',
+                                            'placeholder': '24'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VCronField',
+                                        'props': {
+                                            'model': 'purge_cron',
+                                            'label': '清空回收站周期',
+                                            'placeholder': '0 4 * * *'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'purge_rate',
+                                            'label': '清空限速（MB/s）',
+                                            'placeholder': '0为不限速'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'workers',
+                                            'label': '并发删除数',
+                                            'placeholder': '2'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
                                 },
                                 'content': [
                                     {
                                         'component': 'VTextField',
                                         'props': {
-                                            'model': 'exclude_path',
-                                            'label': '排除路径'
+                                            'model': 'truncate_size',
+                                            'label': '大文件分步删除阈值（GB）',
+                                            'placeholder': '0为不启用'
                                         }
                                     }
                                 ]
-                            }
-                        ]
-                    },
-                    {
-                        'component': 'VRow',
-                        'content': [
+                            },
                             {
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
+                                    'md': 4
                                 },
                                 'content': [
                                     {
-                                        'component': 'VTextarea',
+                                        'component': 'VTextField',
                                         'props': {
-                                            'model': 'library_path',
-                                            'rows': '2',
-                                            'label': '媒体库路径映射',
-                                            'placeholder': '媒体服务器路径:MoviePilot路径（一行一个）'
+                                            'model': 'truncate_rate',
+                                            'label': '分步删除限速（MB/s）',
+                                            'placeholder': '0为不限速'
                                         }
                                     }
                                 ]
@@ -296,6 +1406,9 @@ class MediaSyncDelEmt(_PluginBase):
                                                     '1、Webhook需要Emby4.8.0.45及以上开启媒体删除的Webhook。'
                                                     '2、Scripter X方式需要emby安装并配置Scripter X插件，无需配置执行周期。'
                                                     '3、启用该插件后，非媒体服务器触发的源文件删除，也会同步处理下载器中的下载任务。'
+                                                    '4、定时轮询方式按轮询周期获取Emby媒体库快照，与上次快照对比后同步删除已移除的媒体，'
+                                                    '可补偿Webhook丢失，首次轮询只记录快照；单次移除超过20%时暂不删除，'
+                                                    '连续3次移除相同媒体或调用/poll_baseline接口后接受为新快照。'
                                         }
                                     }
                                 ]
@@ -342,6 +1455,13 @@ class MediaSyncDelEmt(_PluginBase):
                                             'type': 'info',
                                             'variant': 'tonal',
                                             'text': '排除路径：命中排除路径后请求云盘删除插件删除云盘资源。'
+                                                    '清理其他硬链接：需开启删除源文件，启动时扫描硬链接扫描目录建立索引，'
+                                                    '删除源文件时一并删除指向同一文件的其他硬链接，确保磁盘空间真正释放。'
+                                                    '回收站模式：文件移动至所在文件系统根目录下的.mediasyncdel_trash，'
+                                                    '超过保留时间后在清空周期内按限速删除，保留期内可恢复文件，'
+                                                    '转移记录及下载任务不会恢复，恢复后需重新整理。'
+                                                    '大文件分步删除：超过阈值且无其他硬链接的文件先按限速逐步截断再删除，'
+                                                    '避免集中释放磁盘空间影响同盘播放。'
                                         }
                                     }
                                 ]
@@ -402,17 +1522,44 @@ class MediaSyncDelEmt(_PluginBase):
             "del_history": False,
             "library_path": "",
             "sync_type": "webhook",
+            "poll_cron": "*/30 * * * *",
             "exclude_path": "",
+            "hardlink_index": False,
+            "hardlink_paths": "",
+            "trash_mode": False,
+            "trash_retention": 24,
+            "purge_cron": "0 4 * * *",
+            "purge_rate": 0,
+            "truncate_size": 0,
+            "truncate_rate": 0,
+            "workers": 2,
         }
 
     def get_page(self) -> List[dict]:
         """
         拼装插件详情页面，需要返回页面配置，同时附带数据
         """
+        # 回收站概况
+        trash_contents = []
+        trash = self.get_data('trash')
+        if trash:
+            trash_sizes = {tuple(t.get("inode") or [t.get("id")]): t.get("size") or 0 for t in trash}
+            trash_size = sum(trash_sizes.values())
+            trash_contents.append(
+                {
+                    'component': 'VAlert',
+                    'props': {
+                        'type': 'info',
+                        'variant': 'tonal',
+                        'class': 'mb-3',
+                        'text': f'回收站：{len(trash)} 项，共 {StringUtils.str_filesize(trash_size)}'
+                    }
+                }
+            )
         # 查询同步详情
         historys = self.get_data('history')
         if not historys:
-            return [
+            return trash_contents + [
                 {
                     'component': 'div',
                     'text': '暂无数据',
@@ -434,6 +1581,7 @@ class MediaSyncDelEmt(_PluginBase):
             episode = history.get("episode")
             image = history.get("image")
             del_time = history.get("del_time")
+            freed_bytes = (history.get("stats") or {}).get("freed_bytes")
 
             if season:
                 sub_contents = [
@@ -511,6 +1659,16 @@ class MediaSyncDelEmt(_PluginBase):
                         'text': f'时间：{del_time}'
                     }
                 ]
+            if freed_bytes:
+                sub_contents.append(
+                    {
+                        'component': 'VCardText',
+                        'props': {
+                            'class': 'pa-0 px-2'
+                        },
+                        'text': f'释放：{StringUtils.str_filesize(freed_bytes)}'
+                    }
+                )
 
             contents.append(
                 {
@@ -564,7 +1722,7 @@ class MediaSyncDelEmt(_PluginBase):
                 }
             )
 
-        return [
+        return trash_contents + [
             {
                 'component': 'div',
                 'props': {
@@ -606,23 +1764,18 @@ class MediaSyncDelEmt(_PluginBase):
         """
         执行删除逻辑
         """
-        if self._exclude_path and media_path and any(
-                os.path.abspath(media_path).startswith(os.path.abspath(path)) for path in
-                self._exclude_path.split(",")):
-            logger.info(f"媒体路径 {media_path} 已被排除，暂不处理")
-            return
-
-        # 兼容emby webhook season删除没有发送tmdbid
-        if not tmdb_id and str(media_type) != 'Season':
-            logger.error(f"{media_name} 同步删除失败，未获取到TMDB ID，请检查媒体库媒体是否刮削")
+        if self.__check_item(media_type=media_type,
+                             media_name=media_name,
+                             media_path=media_path,
+                             tmdb_id=tmdb_id):
             return
 
-        self.__sync_del(media_type=media_type,
-                        media_name=media_name,
-                        media_path=media_path,
-                        tmdb_id=tmdb_id,
-                        season_num=season_num,
-                        episode_num=episode_num)
+        self.__submit_sync_del(media_type=media_type,
+                               media_name=media_name,
+                               media_path=media_path,
+                               tmdb_id=tmdb_id,
+                               season_num=season_num,
+                               episode_num=episode_num)
 
     @eventmanager.register(EventType.WebhookMessage)
     def sync_del_by_plugin(self, event):
@@ -644,14 +1797,8 @@ class MediaSyncDelEmt(_PluginBase):
         item_isvirtual = event_data.item_isvirtual
         if not item_isvirtual:
             logger.error("Scripter X插件方式，item_isvirtual参数未配置，为防止误删除，暂停插件运行")
-            self.update_config({
-                "enabled": False,
-                "del_source": self._del_source,
-                "exclude_path": self._exclude_path,
-                "library_path": self._library_path,
-                "notify": self._notify,
-                "sync_type": self._sync_type,
-            })
+            self._enabled = False
+            self.__update_config()
             return
 
         # 如果是虚拟item，则直接return，不进行删除
@@ -674,9 +1821,7 @@ class MediaSyncDelEmt(_PluginBase):
         """
         执行删除逻辑
         """
-        if self._exclude_path and media_path and any(
-                os.path.abspath(media_path).startswith(os.path.abspath(path)) for path in
-                self._exclude_path.split(",")):
+        if self.__is_excluded(media_path):
             logger.info(f"媒体路径 {media_path} 已被排除，暂不处理")
             # 发送消息通知网盘删除插件删除网盘资源
             return
@@ -685,96 +1830,415 @@ class MediaSyncDelEmt(_PluginBase):
             logger.error(f"{media_name} 同步删除失败，未获取到TMDB ID，请检查媒体库媒体是否刮削")
             return
 
-        self.__sync_del(media_type=media_type,
-                        media_name=media_name,
-                        media_path=media_path,
-                        tmdb_id=tmdb_id,
-                        season_num=season_num,
-                        episode_num=episode_num)
+        self.__submit_sync_del(media_type=media_type,
+                               media_name=media_name,
+                               media_path=media_path,
+                               tmdb_id=tmdb_id,
+                               season_num=season_num,
+                               episode_num=episode_num)
+
+    def poll_library(self):
+        """
+        轮询媒体库，对比上次快照，同步删除已移除的媒体
+        """
+        if not self._enabled or str(self._sync_type) != "poll":
+            return
+        snapshot = self.__fetch_snapshot()
+        if snapshot is None:
+            return
+        last_snapshot = self.get_data('snapshot')
+        # 旧版本快照格式不同，重新建立
+        if not last_snapshot or any(len(item) != 4 for item in last_snapshot.values()):
+            self.__save_snapshot(snapshot)
+            logger.info(f"媒体库快照已建立，共 {len(snapshot)} 项")
+            return
+        removed = self.__diff_snapshot(last_snapshot, snapshot)
+        if not removed:
+            self.__save_snapshot(snapshot)
+            return
+        total = sum(1 + len(item[3] or []) for item in last_snapshot.values())
+        if len(removed) > max(10, total * self._poll_max_removed_ratio):
+            self.__confirm_removed(removed, snapshot)
+            return
+        self.del_data(key='poll_pending')
+        logger.info(f"媒体库快照对比完成，移除 {len(removed)} 项")
+        for media_type, media_name, tmdb_id, season_num, episode_num, media_path, library_path \
+                in self.__merge_removed(removed):
+            if self.__check_item(media_type=media_type,
+                                 media_name=media_name,
+                                 media_path=library_path,
+                                 tmdb_id=tmdb_id):
+                continue
+            # 单集路径取自转移记录，已是MoviePilot路径，不再做路径映射
+            self.__submit_sync_del(media_type=media_type,
+                                   media_name=media_name,
+                                   media_path=media_path,
+                                   tmdb_id=tmdb_id,
+                                   season_num=season_num,
+                                   episode_num=episode_num,
+                                   map_path=media_type != "Episode")
+        self.__save_snapshot(snapshot)
+
+    def poll_baseline(self, apikey: str):
+        """
+        以当前媒体库重建轮询快照，不同步删除，用于确认大规模清理后的媒体库
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        snapshot = self.__fetch_snapshot()
+        if snapshot is None:
+            return schemas.Response(success=False, message="获取媒体库快照失败，详见日志")
+        self.__save_snapshot(snapshot)
+        logger.info(f"媒体库快照已重建，共 {len(snapshot)} 项")
+        return schemas.Response(success=True, message=f"媒体库快照已重建，共 {len(snapshot)} 项")
+
+    def __save_snapshot(self, snapshot: Dict[str, list]):
+        """
+        保存快照，同时清除待确认的移除记录
+        """
+        self.save_data('snapshot', snapshot)
+        self.del_data(key='poll_pending')
+
+    def __confirm_removed(self, removed: List[tuple], snapshot: Dict[str, list]):
+        """
+        移除比例超过阈值时不同步删除；连续多次轮询移除项一致时视为人工清理，接受当前媒体库为新快照
+        """
+        digest = hashlib.blake2b("\n".join(sorted(str(item[:5]) for item in removed)).encode(),
+                                 digest_size=8).hexdigest()
+        pending = self.get_data('poll_pending') or {}
+        count = pending.get("count", 0) + 1 if pending.get("digest") == digest else 1
+        if count >= self._poll_confirm_runs:
+            self.__save_snapshot(snapshot)
+            logger.warn(f"媒体库连续 {count} 次轮询移除相同的 {len(removed)} 项，已接受当前媒体库为新快照，"
+                        f"这些媒体不会同步删除，如需删除请使用批量同步删除")
+            return
+        self.save_data('poll_pending', {"digest": digest, "count": count})
+        logger.error(f"媒体库本次移除 {len(removed)} 项，超过上次快照的"
+                     f"{int(self._poll_max_removed_ratio * 100)}%，疑似媒体库异常，暂不同步删除；"
+                     f"连续 {self._poll_confirm_runs} 次移除相同媒体或调用 /poll_baseline 后接受为新快照"
+                     f"（当前第 {count} 次）")
+
+    def __fetch_snapshot(self) -> Optional[Dict[str, list]]:
+        """
+        获取Emby媒体库快照：摘要(服务器、媒体ID、路径) -> [TMDB ID, 标题, 路径, 剧集季集编码]
+        电影的季集编码为None，剧集每集编码为 季*1000+集，整部剧只保存一次标题、路径
+        """
+        services = MediaServerHelper().get_services(type_filter="emby")
+        if not services:
+            logger.warn("未获取到Emby媒体服务器，无法轮询媒体库")
+            return None
+        mediaserver_chain = MediaServerChain()
+        snapshot = {}
+        try:
+            for server in services.keys():
+                for library in mediaserver_chain.librarys(server) or []:
+                    for item in mediaserver_chain.items(server=server, library_id=library.id) or []:
+                        if not item or not item.tmdbid or item.item_type not in ["Movie", "Series"]:
+                            continue
+                        key = hashlib.blake2b(f"{server}|{item.item_id}|{item.path}".encode(),
+                                              digest_size=8).hexdigest()
+                        codes = None
+                        if item.item_type == "Series":
+                            codes = sorted({int(season.season) * 1000 + int(episode)
+                                            for season in mediaserver_chain.episodes(server, item.item_id) or []
+                                            for episode in season.episodes or []})
+                        snapshot[key] = [item.tmdbid, item.title, item.path, codes]
+        except Exception as e:
+            logger.error(f"获取媒体库快照失败：{str(e)}")
+            return None
+        if not snapshot:
+            logger.warn("媒体库快照为空，跳过本次轮询")
+            return None
+        return snapshot
+
+    @staticmethod
+    def __diff_snapshot(last_snapshot: Dict[str, list], snapshot: Dict[str, list]) -> List[tuple]:
+        """
+        对比快照，整部移除的电影、剧集不再展开季集
+        :return: [(类型, 标题, TMDB ID, 季, 集, 路径)]
+        """
+        removed = []
+        for key, (tmdb_id, title, path, codes) in last_snapshot.items():
+            media_type = "Movie" if codes is None else "Series"
+            current = snapshot.get(key)
+            if not current:
+                removed.append((media_type, title, tmdb_id, None, None, path))
+                continue
+            for code in sorted(set(codes or []) - set(current[3] or [])):
+                removed.append(("Episode", title, tmdb_id, code // 1000, code % 1000, path))
+        return removed
+
+    def __merge_removed(self, removed: List[tuple]) -> List[tuple]:
+        """
+        单集按季查询一次转移记录得到目的路径
+        :return: [(类型, 标题, TMDB ID, 季, 集, 删除路径, 媒体库路径)]
+        """
+        episodes: Dict[Tuple, List[int]] = {}
+        tasks = []
+        for media_type, media_name, tmdb_id, season_num, episode_num, media_path in removed:
+            if media_type != "Episode":
+                tasks.append((media_type, media_name, tmdb_id, None, None, media_path, media_path))
+            else:
+                episodes.setdefault((media_name, tmdb_id, season_num, media_path), []).append(episode_num)
+        for (media_name, tmdb_id, season_num, media_path), episode_nums in episodes.items():
+            transfer_history = self._transferhis.get_by(tmdbid=tmdb_id,
+                                                        mtype=MediaType.TV.value,
+                                                        season=f'S{str(season_num).rjust(2, "0")}') or []
+            dests = {}
+            for transferhis in transfer_history:
+                dests.setdefault(transferhis.episodes, []).append(transferhis.dest)
+            for episode_num in episode_nums:
+                for dest in dests.get(f'E{str(episode_num).rjust(2, "0")}') or []:
+                    tasks.append(("Episode", media_name, tmdb_id, season_num, episode_num, dest, media_path))
+        return tasks
+
+    def __check_item(self, media_type: str, media_name: str, media_path: str, tmdb_id: int) -> Optional[str]:
+        """
+        校验删除项
+        :return: 不处理的原因，为空时可删除
+        """
+        if self.__is_excluded(media_path):
+            logger.info(f"媒体路径 {media_path} 已被排除，暂不处理")
+            return "媒体路径已被排除"
+
+        # 兼容emby webhook season删除没有发送tmdbid
+        if not tmdb_id and str(media_type) != 'Season':
+            logger.error(f"{media_name} 同步删除失败，未获取到TMDB ID，请检查媒体库媒体是否刮削")
+            return "未获取到TMDB ID"
+        return None
+
+    def __submit_sync_del(self, media_type: str, media_name: str, media_path: str,
+                          tmdb_id: int, season_num: str, episode_num: str, map_path: bool = True):
+        """
+        提交同步删除任务，按单集/电影与整季/整剧区分优先级
+        :param map_path: 媒体路径是否为媒体服务器路径，需要做路径映射
+        """
+        job = {
+            "media_type": media_type,
+            "media_name": media_name,
+            "media_path": media_path,
+            "tmdb_id": tmdb_id,
+            "season_num": season_num,
+            "episode_num": episode_num,
+            "map_path": map_path
+        }
+        if not self._delete_scheduler or not self._delete_scheduler.running:
+            self.__sync_del(**job)
+            return
+        self._delete_scheduler.submit(self.__sync_del, job, bulk=self.__is_bulk(media_type, episode_num))
+
+    @staticmethod
+    def __is_bulk(media_type: str, episode_num: str) -> bool:
+        """
+        是否为批量删除任务（整季、整剧）
+        """
+        if media_type in ["Movie", "MOV", "Episode"]:
+            return False
+        return not (episode_num and str(episode_num).isdigit())
+
+    def __yield_interactive(self):
+        """
+        批量删除过程中让出，优先执行排队中的交互任务
+        """
+        if not self._delete_scheduler:
+            return
+        stats = getattr(self._deletion_stats, "values", None)
+        batch = getattr(self._deletion_stats, "batch", None)
+        self._deletion_stats.batch = None
+        self._delete_scheduler.yield_interactive()
+        self._deletion_stats.values = stats
+        self._deletion_stats.batch = batch
+
+    def __map_library_path(self, media_path: str) -> str:
+        """
+        媒体服务器路径映射为MoviePilot路径
+        """
+        for source_path, target_path in self._library_paths:
+            media_path = media_path.replace(source_path, target_path).replace('\\', '/')
+        return media_path
+
+    def __is_excluded(self, media_path: str) -> bool:
+        """
+        判断媒体路径是否命中排除路径
+        """
+        if not self._exclude_paths or not media_path:
+            return False
+        media_path = os.path.abspath(media_path)
+        return any(media_path.startswith(path) for path in self._exclude_paths)
 
     def __sync_del(self, media_type: str, media_name: str, media_path: str,
-                   tmdb_id: int, season_num: str, episode_num: str):
+                   tmdb_id: int, season_num: str, episode_num: str, map_path: bool = True):
+        """
+        同步删除
+        """
+        kwargs = {
+            "media_type": media_type,
+            "media_name": media_name,
+            "media_path": media_path,
+            "tmdb_id": tmdb_id,
+            "season_num": season_num,
+            "episode_num": episode_num,
+            "map_path": map_path
+        }
+        # 同一媒体的删除串行执行，不同媒体可并行
+        lock_key = self.__lock_key(tmdb_id, season_num)
+        nested = self._delete_scheduler.nested if self._delete_scheduler else False
+        if not self._media_lock.acquire(lock_key, blocking=not nested):
+            # 批量任务让出时遇到冲突，重新排队避免互相等待
+            logger.info(f"{media_name} 存在正在进行的同步删除，重新排队")
+            self._delete_scheduler.submit(self.__sync_del, kwargs, bulk=False)
+            return None
+        try:
+            return self.__profile_sync_del(kwargs)
+        finally:
+            self._media_lock.release(lock_key)
+
+    @staticmethod
+    def __lock_key(tmdb_id: Any, season_num: Any) -> Tuple[Any, Any]:
+        """
+        删除锁的键：(tmdb_id, 季)，emby webhook季删除未发送tmdb_id时为全局锁
+        """
+        tmdb_id = str(tmdb_id) if tmdb_id else None
+        season_num = int(season_num) if season_num and str(season_num).isdigit() else None
+        return tmdb_id, season_num
+
+    def __profile_sync_del(self, kwargs: Dict[str, Any]):
+        """
+        开启性能分析时记录调用栈
+        """
+        if not self._profile_count and not self._profile_threshold:
+            return self.__sync_del_media(**kwargs)
+        # cProfile同一时间只能有一个实例，其余事件不分析
+        if not self._profile_lock.acquire(blocking=False):
+            return self.__sync_del_media(**kwargs)
+        try:
+            # 按次数分析时记录完整调用统计；仅按阈值分析时只采样，避免cProfile拖慢每次删除
+            profiler = cProfile.Profile() if self._profile_count > 0 else None
+            sampler = SamplingProfiler()
+            start_time = time.perf_counter()
+            sampler.start()
+            if profiler:
+                profiler.enable()
+            try:
+                return self.__sync_del_media(**kwargs)
+            finally:
+                if profiler:
+                    profiler.disable()
+                sampler.stop()
+                self.__save_profile(profiler=profiler,
+                                    sampler=sampler,
+                                    elapsed=(time.perf_counter() - start_time) * 1000)
+        finally:
+            self._profile_lock.release()
+
+    def __get_profile_path(self) -> Path:
+        """
+        性能分析文件目录
+        """
+        profile_path = self.get_data_path() / "profiles"
+        profile_path.mkdir(parents=True, exist_ok=True)
+        return profile_path
+
+    def __save_profile(self, profiler: Optional[cProfile.Profile], sampler: SamplingProfiler, elapsed: float):
+        """
+        保存pstats与collapsed stack文件，超出数量的旧文件轮转删除
+        """
+        if profiler and self._profile_count > 0:
+            self._profile_count -= 1
+        elif not self._profile_threshold or elapsed < self._profile_threshold:
+            return
+        collapsed = sampler.collapsed()
+        if not collapsed:
+            # 耗时短于采样间隔时没有采样数据
+            logger.info(f"同步删除耗时 {int(elapsed)}ms，短于采样间隔，未生成collapsed文件")
+            if not profiler:
+                return
+        profile_path = self.__get_profile_path()
+        name = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}_{int(elapsed)}ms"
+        try:
+            if profiler:
+                profiler.dump_stats(str(profile_path / f"{name}.pstats"))
+            if collapsed:
+                (profile_path / f"{name}.collapsed").write_text(collapsed, encoding="utf-8")
+        except OSError as e:
+            logger.error(f"保存性能分析文件失败：{str(e)}")
+            return
+        logger.info(f"同步删除耗时 {int(elapsed)}ms，性能分析已保存至 {profile_path / name}")
+        # 轮转
+        names = sorted({f.stem for f in profile_path.glob("*.*")}, reverse=True)
+        for stem in names[self._profile_keep:]:
+            for old_file in profile_path.glob(f"{stem}.*"):
+                old_file.unlink(missing_ok=True)
+
+    def __sync_del_media(self, media_type: str, media_name: str, media_path: str,
+                         tmdb_id: int, season_num: str, episode_num: str, map_path: bool = True):
         if not media_type:
             logger.error(f"{media_name} 同步删除失败，未获取到媒体类型，请检查媒体是否刮削")
             return
 
+        # 耗时统计
+        start_time = time.perf_counter()
+        self._deletion_stats.values = {}
+
         # 处理路径映射 (处理同一媒体多分辨率的情况)
-        if self._library_path:
-            paths = self._library_path.split("\n")
-            for path in paths:
-                sub_paths = path.split(":")
-                if len(sub_paths) < 2:
-                    continue
-                media_path = media_path.replace(sub_paths[0], sub_paths[1]).replace('\\', '/')
+        if media_path and map_path:
+            media_path = self.__map_library_path(media_path)
 
         # 兼容重新整理的场景
-        if Path(media_path).exists():
+        if media_path and Path(media_path).exists():
             logger.warn(f"转移路径 {media_path} 未被删除或重新生成，跳过处理")
             return
 
         # 查询转移记录
-        msg, transfer_history = self.__get_transfer_his(media_type=media_type,
+        msg, transfer_filters = self.__get_transfer_his(media_type=media_type,
                                                         media_name=media_name,
                                                         media_path=media_path,
                                                         tmdb_id=tmdb_id,
                                                         season_num=season_num,
                                                         episode_num=episode_num)
+        if transfer_filters is None:
+            return
 
         logger.info(f"正在同步删除{msg}")
 
-        if not transfer_history:
-            logger.warn(
-                f"{media_type} {media_name} 未获取到可删除数据，请检查路径映射是否配置错误，请检查tmdbid获取是否正确")
-            return
-
-        logger.info(f"获取到 {len(transfer_history)} 条转移记录，开始同步删除")
         # 开始删除
-        year = None
         del_torrent_hashs = []
         stop_torrent_hashs = []
         error_cnt = 0
-        image = 'https://emby.media/notificationicon.png'
-        for transferhis in transfer_history:
-            title = transferhis.title
-            if title not in media_name:
-                logger.warn(
-                    f"当前转移记录 {transferhis.id} {title} {transferhis.tmdbid} 与删除媒体{media_name}不符，防误删，暂不自动删除")
-                continue
-            image = transferhis.image or image
-            year = transferhis.year
-
-            # 0、删除转移记录
-            self._transferhis.delete(transferhis.id)
-
-            # 删除种子任务
-            if self._del_source:
-                # 1、直接删除源文件
-                if transferhis.src and Path(transferhis.src).suffix in settings.RMT_MEDIAEXT:
-                    # 删除硬链接文件和源文件
-                    if Path(transferhis.dest).exists():
-                        Path(transferhis.dest).unlink(missing_ok=True)
-                        self.__remove_parent_dir(Path(transferhis.dest))
-                    if Path(transferhis.src).exists():
-                        logger.info(f"源文件 {transferhis.src} 开始删除")
-                        Path(transferhis.src).unlink(missing_ok=True)
-                        logger.info(f"源文件 {transferhis.src} 已删除")
-                        self.__remove_parent_dir(Path(transferhis.src))
-                        if transferhis.download_hash:
-                            logger.info(f"通知下载器助手删除文件,src: {transferhis.src},download_hash: {transferhis.download_hash}")
-                            self.eventmanager.send_event(
-                                EventType.DownloadFileDeleted,
-                                {
-                                    "src": transferhis.src,
-                                    "hash": transferhis.download_hash
-                                }
-                            )
 
-        logger.info(f"同步删除 {msg} 完成！")
+        # 按批生成去重后的删除计划并执行，回收站记录在本次删除结束后统一写入
+        outer_trash = getattr(self._deletion_stats, "trash", None)
+        self._deletion_stats.trash = []
+        try:
+            plan = self.__delete_by_plan(msg=msg, media_name=media_name, transfer_filters=transfer_filters)
+        finally:
+            self.__save_trash(self._deletion_stats.trash)
+            self._deletion_stats.trash = outer_trash
+        # 读取到的记录数只用于判断是否有数据，统计与通知使用实际删除的记录数
+        fetched_cnt = plan["fetched_cnt"]
+        record_cnt = plan["record_cnt"]
+        query_time = plan["query_time"]
+        image = plan["image"] or 'https://emby.media/notificationicon.png'
+        year = plan["year"]
+        file_cnt = plan["file_cnt"]
+        unreclaimed_cnt = plan["unreclaimed_cnt"]
+
+        if not fetched_cnt:
+            logger.warn(
+                f"{media_type} {media_name} 未获取到可删除数据，请检查路径映射是否配置错误，请检查tmdbid获取是否正确")
+            return
+
+        delete_time = time.perf_counter()
+        logger.info(f"同步删除 {msg} 完成！查询耗时 {query_time:.3f}s，"
+                    f"删除耗时 {delete_time - start_time - query_time:.3f}s，删除文件 {file_cnt} 个")
 
         media_type = MediaType.MOVIE if media_type in ["Movie", "MOV"] else MediaType.TV
 
+        # 批量删除时统一发送消息、保存历史
+        batch = getattr(self._deletion_stats, "batch", None)
+
         # 发送消息
-        if self._notify:
+        if self._notify and batch is None:
             backrop_image = self.chain.obtain_specific_image(
                 mediaid=tmdb_id,
                 mtype=media_type,
@@ -796,27 +2260,32 @@ class MediaSyncDelEmt(_PluginBase):
                     torrent_cnt_msg += f"暂停种子{stop_cnt}个\n"
             if error_cnt:
                 torrent_cnt_msg += f"删种失败{error_cnt}个\n"
+            if unreclaimed_cnt:
+                torrent_cnt_msg += f"仍有硬链接未释放空间{unreclaimed_cnt}个\n"
+            freed_bytes = self._deletion_stats.values.get("freed_bytes")
+            if freed_bytes:
+                torrent_cnt_msg += f"释放空间{StringUtils.str_filesize(freed_bytes)}\n"
+            trash_bytes = self._deletion_stats.values.get("trash_bytes")
+            if trash_bytes:
+                torrent_cnt_msg += f"移至回收站{StringUtils.str_filesize(trash_bytes)}，清空后释放\n"
             # 发送通知
             self.post_message(
                 mtype=NotificationType.Plugin,
                 title="媒体库同步删除任务完成",
                 image=backrop_image,
                 text=f"{msg}\n"
-                     f"删除记录{len(transfer_history)}个\n"
+                     f"删除记录{record_cnt}个\n"
                      f"{torrent_cnt_msg}"
                      f"时间 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time()))}"
             )
 
-        # 读取历史记录
-        history = self.get_data('history') or []
-
         # 获取poster
         poster_image = self.chain.obtain_specific_image(
             mediaid=tmdb_id,
             mtype=media_type,
             image_type=MediaImageType.Poster,
         ) or image
-        history.append({
+        history_item = {
             "type": media_type.value,
             "title": media_name,
             "year": year,
@@ -825,11 +2294,254 @@ class MediaSyncDelEmt(_PluginBase):
             "episode": episode_num if episode_num and str(episode_num).isdigit() else None,
             "image": poster_image,
             "del_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())),
-            "unique": f"{media_name}:{tmdb_id}:{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time()))}"
-        })
+            "unique": f"{media_name}:{tmdb_id}:{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time()))}",
+            "stats": {
+                "records": record_cnt,
+                "files": file_cnt,
+                "query_time": round(query_time, 3),
+                "delete_time": round(delete_time - start_time - query_time, 3),
+                "total_time": round(time.perf_counter() - start_time, 3),
+                **self._deletion_stats.values
+            },
+            "plan": plan["audit"]
+        }
+        if batch is not None:
+            batch.append(history_item)
+            return history_item
 
         # 保存历史
-        self.save_data("history", history)
+        self.__save_history([history_item])
+        return history_item
+
+    def __save_history(self, history_items: List[Dict[str, Any]]):
+        """
+        追加历史记录，串行写入避免并发删除时丢失记录
+        """
+        with self._history_lock:
+            history = self.get_data('history') or []
+            history.extend(history_items)
+            self.save_data("history", history)
+
+    def __delete_by_plan(self, msg: str, media_name: str, transfer_filters: list) -> Dict[str, Any]:
+        """
+        按批读取转移记录，每批生成删除计划、执行并提交后再读取下一批；
+        已处理的文件、种子跨批次记录，保证只处理一次，空目录在全部批次完成后统一清理
+        """
+        result = {
+            "fetched_cnt": 0,
+            "record_cnt": 0,
+            "file_cnt": 0,
+            "unreclaimed_cnt": 0,
+            "image": None,
+            "year": None,
+            "query_time": 0.0,
+            # 删除计划汇总，明细只保留前若干条用于审计
+            "audit": {"records": 0, "files": 0, "dirs": 0, "torrents": 0,
+                      "file_list": [], "dir_list": [], "torrent_list": []}
+        }
+        # 已处理的文件路径 -> 删除前是否存在，已处理的(源文件, 种子hash)
+        seen = {"files": {}, "torrents": set()}
+        # 待清理的目录 -> 目录下已删除的文件
+        dirs = {}
+        audit = result["audit"]
+        transfer_chunks = self.__iter_transfer_his(transfer_filters)
+        while True:
+            fetch_time = time.perf_counter()
+            transfer_history = next(transfer_chunks, None)
+            result["query_time"] += time.perf_counter() - fetch_time
+            if not transfer_history:
+                break
+            result["fetched_cnt"] += len(transfer_history)
+            plan = self.__build_plan(transfer_history=transfer_history, media_name=media_name, seen=seen)
+            result["record_cnt"] += len(plan["record_ids"])
+            result["image"] = plan["image"] or result["image"]
+            result["year"] = plan["year"] or result["year"]
+            logger.info(f"{msg} 已读取 {result['fetched_cnt']} 条转移记录，本批删除计划："
+                        f"转移记录 {len(plan['record_ids'])} 条，文件 {len(plan['files'])} 个，"
+                        f"种子 {len(plan['torrents'])} 个")
+            file_cnt, unreclaimed_cnt = self.__execute_plan(plan=plan, seen=seen, dirs=dirs)
+            result["file_cnt"] += file_cnt
+            result["unreclaimed_cnt"] += unreclaimed_cnt
+            audit["records"] += len(plan["record_ids"])
+            for key, values in (("file", list(plan["files"])),
+                                ("torrent", [torrent_hash for _, torrent_hash in plan["torrents"]])):
+                audit[f"{key}s"] += len(values)
+                audit_list = audit[f"{key}_list"]
+                audit_list.extend(values[:max(self._plan_audit_limit - len(audit_list), 0)])
+
+        # 清理空目录，由深到浅
+        dir_paths = sorted(dirs, key=lambda d: len(Path(d).parts), reverse=True)
+        for dir_path in dir_paths:
+            self.__remove_parent_dir(Path(dirs[dir_path]))
+        audit["dirs"] = len(dir_paths)
+        audit["dir_list"] = dir_paths[:self._plan_audit_limit]
+        return result
+
+    def __build_plan(self, transfer_history: list, media_name: str, seen: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        由一批转移记录生成删除计划：转移记录、文件、种子，跳过之前批次已处理的文件、种子
+        """
+        plan = {
+            "record_ids": [],
+            # 文件路径 -> 是否源文件，保持读取顺序
+            "files": {},
+            # (源文件, 种子hash)
+            "torrents": {},
+            "image": None,
+            "year": None
+        }
+        for transferhis in transfer_history:
+            title = transferhis.title
+            if title not in media_name:
+                logger.warn(
+                    f"当前转移记录 {transferhis.id} {title} {transferhis.tmdbid} 与删除媒体{media_name}不符，防误删，暂不自动删除")
+                continue
+            plan["image"] = transferhis.image or plan["image"]
+            plan["year"] = transferhis.year
+            plan["record_ids"].append(transferhis.id)
+
+            # 删除源文件时，媒体文件及其硬链接、下载任务加入计划
+            src = transferhis.src
+            if not self._del_source or not src:
+                continue
+            if src not in plan["files"] and src not in seen["files"] \
+                    and Path(src).suffix not in settings.RMT_MEDIAEXT:
+                continue
+            if transferhis.dest and transferhis.dest not in seen["files"]:
+                plan["files"].setdefault(transferhis.dest, False)
+            if src not in seen["files"]:
+                plan["files"][src] = True
+            torrent = (src, transferhis.download_hash)
+            if transferhis.download_hash and torrent not in seen["torrents"]:
+                plan["torrents"].setdefault(torrent, None)
+        return plan
+
+    def __execute_plan(self, plan: Dict[str, Any], seen: Dict[str, Any], dirs: Dict[str, str]) -> Tuple[int, int]:
+        """
+        执行一批删除计划：文件、种子跨批次只处理一次，本批转移记录删除后立即提交
+        :param seen: 已处理的文件、种子，执行后更新
+        :param dirs: 待清理的目录，执行后更新
+        :return: 删除文件数, 仍未释放空间的文件数
+        """
+        # 删除前记录inode，用于查找其他硬链接及判断空间是否释放，同时判断文件是否存在
+        inodes = self.__stat_inodes(*plan["files"])
+        existing = {path for info in inodes.values() for path in info["paths"]}
+        for file_path in plan["files"]:
+            seen["files"][file_path] = file_path in existing
+        file_cnt = 0
+        # 移至回收站的路径，inode仍在磁盘上，清空回收站时才释放空间
+        trashed = set()
+        for file_path, is_src in plan["files"].items():
+            # 批量删除时优先处理排队中的单集、电影删除
+            self.__yield_interactive()
+            if file_path not in existing:
+                continue
+            if is_src:
+                logger.info(f"源文件 {file_path} 开始删除")
+            if self.__remove_file(Path(file_path)):
+                trashed.add(file_path)
+            file_cnt += 1
+            if is_src:
+                logger.info(f"源文件 {file_path} 已删除")
+            dirs.setdefault(str(Path(file_path).parent), file_path)
+
+        # 通知下载器助手
+        for src, download_hash in plan["torrents"]:
+            seen["torrents"].add((src, download_hash))
+            if not seen["files"].get(src):
+                continue
+            logger.info(f"通知下载器助手删除文件,src: {src},download_hash: {download_hash}")
+            self.eventmanager.send_event(
+                EventType.DownloadFileDeleted,
+                {
+                    "src": src,
+                    "hash": download_hash
+                }
+            )
+
+        # 删除其他硬链接
+        unreclaimed_cnt = self.__del_hardlinks(inodes, trashed)
+
+        # 删除本批转移记录并提交
+        self.__delete_transfer_his(plan["record_ids"])
+        return file_cnt, unreclaimed_cnt
+
+    @staticmethod
+    def __stat_inodes(*paths: str) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """
+        获取文件的inode信息，同一inode的路径合并
+        """
+        inodes = {}
+        for path in paths:
+            if not path:
+                continue
+            try:
+                stat = os.lstat(path)
+            except OSError:
+                continue
+            key = (stat.st_dev, stat.st_ino)
+            if key not in inodes:
+                inodes[key] = {"nlink": stat.st_nlink, "size": stat.st_size, "paths": set()}
+            inodes[key]["paths"].add(path)
+        return inodes
+
+    def __del_hardlinks(self, inodes: Dict[Tuple[int, int], Dict[str, Any]], trashed: Set[str]) -> int:
+        """
+        删除指向同一inode的其他硬链接
+        :param trashed: 已移至回收站的路径
+        :return: 仍未释放空间的文件数
+        """
+        unreclaimed_cnt = 0
+        for key, info in inodes.items():
+            removed = len(info["paths"])
+            in_trash = any(path in trashed for path in info["paths"])
+            for path in info["paths"]:
+                self._size_index.remove(path)
+            if self._inode_index:
+                for path in info["paths"]:
+                    self._inode_index.remove(path)
+                if not self._inode_index.ready:
+                    logger.warn("硬链接索引尚未建立完成，本次不清理其他硬链接")
+                else:
+                    for sibling in self._inode_index.siblings(key, exclude=info["paths"]):
+                        if self.__is_excluded(sibling):
+                            logger.info(f"硬链接 {sibling} 在排除目录中，跳过删除")
+                            continue
+                        logger.info(f"硬链接 {sibling} 开始删除")
+                        if self.__remove_file(Path(sibling)):
+                            in_trash = True
+                        self._inode_index.remove(sibling)
+                        self._size_index.remove(sibling)
+                        removed += 1
+                        logger.info(f"硬链接 {sibling} 已删除")
+                        self.__notify_downloader(sibling)
+                        self.__remove_parent_dir(Path(sibling))
+            remaining = info["nlink"] - removed
+            if remaining > 0:
+                unreclaimed_cnt += 1
+                logger.warn(f"文件 {'、'.join(info['paths'])} 仍有 {remaining} 个硬链接，磁盘空间未释放")
+            elif in_trash:
+                # 回收站中的链接仍占用空间，清空回收站时才计入释放
+                self.__add_stat("trash_bytes", info["size"])
+            else:
+                self.__add_stat("freed_bytes", info["size"])
+        return unreclaimed_cnt
+
+    def __notify_downloader(self, file_path: str):
+        """
+        硬链接位于下载目录时，查询所属种子并通知下载器助手
+        """
+        downloadfile = self._downloadhis.get_file_by_fullpath(file_path)
+        if not downloadfile or not downloadfile.download_hash:
+            return
+        logger.info(f"通知下载器助手删除文件,src: {file_path},download_hash: {downloadfile.download_hash}")
+        self.eventmanager.send_event(
+            EventType.DownloadFileDeleted,
+            {
+                "src": file_path,
+                "hash": downloadfile.download_hash
+            }
+        )
 
     def __remove_parent_dir(self, file_path: Path):
         """
@@ -844,17 +2556,202 @@ class MediaSyncDelEmt(_PluginBase):
                 i += 1
                 if i > 3:
                     break
+                if not parent_path.exists():
+                    # 已随其他目录一并清理
+                    continue
                 if str(parent_path.parent) != str(file_path.root):
                     # 父目录非根目录，才删除父目录
-                    if not SystemUtils.exits_files(parent_path, settings.RMT_MEDIAEXT):
-                        # 当前路径下没有媒体文件则删除
-                        shutil.rmtree(parent_path)
-                        logger.warn(f"本地空目录 {parent_path} 已删除")
+                    if (parent_path / self._trash_name).exists():
+                        # 回收站所在目录不删除
+                        break
+                    try:
+                        if not SystemUtils.exits_files(parent_path, settings.RMT_MEDIAEXT):
+                            # 当前路径下没有媒体文件则删除
+                            if not self._trash_mode or not self.__move_to_trash(parent_path):
+                                shutil.rmtree(parent_path)
+                            logger.warn(f"本地空目录 {parent_path} 已删除")
+                    except FileNotFoundError:
+                        # 并行删除同一媒体的其他季或同目录的其他媒体时，目录可能已被其他任务清理
+                        logger.info(f"本地空目录 {parent_path} 已被其他任务清理")
+
+    def __remove_file(self, file_path: Path) -> bool:
+        """
+        删除文件，回收站模式下移动至回收站
+        :return: 是否已移至回收站
+        """
+        if self._trash_mode and self.__move_to_trash(file_path):
+            return True
+        self.__unlink(file_path)
+        return False
+
+    def __unlink(self, file_path: Path) -> int:
+        """
+        删除文件，超过阈值且无其他硬链接的大文件先限速分步截断
+        :return: 截断的字节数
+        """
+        truncated = 0
+        threshold = float(self._truncate_size or 0) * 1024 ** 3
+        if threshold > 0:
+            try:
+                stat = file_path.lstat()
+            except OSError:
+                stat = None
+            # 存在其他硬链接时截断会破坏其他链接的数据
+            if stat and statmod.S_ISREG(stat.st_mode) and stat.st_nlink == 1 and stat.st_size > threshold:
+                start_time = time.perf_counter()
+                try:
+                    truncated = truncate_file(file_path, rate=float(self._truncate_rate or 0) * 1024 ** 2)
+                except OSError as e:
+                    logger.warn(f"{file_path} 分步截断失败：{str(e)}，直接删除")
+                if truncated:
+                    self.__add_stat("truncated_files", 1)
+                    self.__add_stat("truncated_bytes", truncated)
+                    self.__add_stat("truncate_time", round(time.perf_counter() - start_time, 3))
+                    logger.info(f"{file_path} 已分步截断 {StringUtils.str_filesize(truncated)}")
+        file_path.unlink(missing_ok=True)
+        return truncated
+
+    def __add_stat(self, key: str, value: Any):
+        """
+        累加当前线程删除统计
+        """
+        stats = getattr(self._deletion_stats, "values", None)
+        if stats is not None:
+            stats[key] = stats.get(key, 0) + value
+
+    def __move_to_trash(self, path: Path) -> bool:
+        """
+        重命名至同一文件系统的回收站，耗时与文件大小无关
+        """
+        try:
+            stat = os.lstat(path)
+        except OSError:
+            return False
+        trash_dir = self.__get_trash_dir(path, stat.st_dev)
+        if not trash_dir:
+            return False
+        trash_id = uuid.uuid4().hex
+        trash_path = trash_dir / f"{trash_id[:8]}_{path.name}"
+        try:
+            os.rename(path, trash_path)
+        except OSError as e:
+            logger.warn(f"{path} 移动至回收站失败：{str(e)}，直接删除")
+            return False
+        # 同一文件的多个硬链接按inode只计一次大小，目录不计自身大小
+        trash_item = {
+            "id": trash_id,
+            "path": str(path),
+            "trash": str(trash_path),
+            "is_dir": os.path.isdir(trash_path),
+            "inode": [stat.st_dev, stat.st_ino],
+            "size": stat.st_size if statmod.S_ISREG(stat.st_mode) else 0,
+            "time": time.time()
+        }
+        # 同步删除过程中先暂存，结束后统一写入
+        pending = getattr(self._deletion_stats, "trash", None)
+        if pending is not None:
+            pending.append(trash_item)
+        else:
+            self.__save_trash([trash_item])
+        logger.info(f"{path} 已移动至回收站 {trash_path}")
+        return True
+
+    def __save_trash(self, trash_items: List[Dict[str, Any]]):
+        """
+        追加回收站记录，一次读写
+        """
+        if not trash_items:
+            return
+        with self._trash_lock:
+            trash = self.get_data('trash') or []
+            trash.extend(trash_items)
+            self.save_data('trash', trash)
+
+    def __get_trash_dir(self, path: Path, st_dev: int) -> Optional[Path]:
+        """
+        获取文件所在文件系统的回收站目录（挂载点下）
+        """
+        trash_dir = self._trash_dirs.get(st_dev)
+        if trash_dir and trash_dir.is_dir():
+            return trash_dir
+        mount_path = path.parent
+        try:
+            while mount_path.parent != mount_path and os.lstat(mount_path.parent).st_dev == st_dev:
+                mount_path = mount_path.parent
+            trash_dir = mount_path / self._trash_name
+            trash_dir.mkdir(exist_ok=True)
+        except OSError as e:
+            logger.warn(f"{path} 所在文件系统无法创建回收站：{str(e)}")
+            return None
+        self._trash_dirs[st_dev] = trash_dir
+        return trash_dir
+
+    def purge_trash(self):
+        """
+        清空回收站中超过保留时间的文件，按限速删除
+        """
+        with self._trash_lock:
+            trash = self.get_data('trash') or []
+        expire_time = time.time() - float(self._trash_retention or 0) * 3600
+        purged = set()
+        freed_bytes = 0
+        for item in trash:
+            if (item.get("time") or 0) > expire_time:
+                continue
+            try:
+                freed_bytes += self.__purge_path(Path(item.get("trash")))
+            except OSError as e:
+                logger.error(f"回收站文件 {item.get('trash')} 删除失败：{str(e)}")
+                continue
+            purged.add(item.get("id"))
+        if not purged:
+            return
+        with self._trash_lock:
+            trash = self.get_data('trash') or []
+            self.save_data('trash', [t for t in trash if t.get("id") not in purged])
+        logger.info(f"回收站已清理 {len(purged)} 项，释放空间 {StringUtils.str_filesize(freed_bytes)}")
+
+    def __purge_path(self, path: Path) -> int:
+        """
+        删除回收站中的文件或目录，每删除一个文件按限速休眠
+        :return: 释放的字节数
+        """
+        if not path.exists():
+            return 0
+        if not path.is_dir():
+            return self.__purge_file(path)
+        freed_bytes = 0
+        for root, dirs, files in os.walk(path, topdown=False):
+            for name in files:
+                freed_bytes += self.__purge_file(Path(root) / name)
+            for name in dirs:
+                dir_path = os.path.join(root, name)
+                if os.path.islink(dir_path):
+                    os.unlink(dir_path)
+                else:
+                    os.rmdir(dir_path)
+        path.rmdir()
+        return freed_bytes
+
+    def __purge_file(self, file_path: Path) -> int:
+        """
+        删除回收站中的文件
+        :return: 释放的字节数，仍有其他硬链接时为0
+        """
+        stat = file_path.lstat()
+        freed_bytes = stat.st_size if stat.st_nlink == 1 else 0
+        if self.__unlink(file_path):
+            # 已分步截断限速
+            return freed_bytes
+        rate = float(self._purge_rate or 0) * 1024 * 1024
+        if rate > 0:
+            time.sleep(stat.st_size / rate)
+        return freed_bytes
 
     def __get_transfer_his(self, media_type: str, media_name: str, media_path: str,
                            tmdb_id: int, season_num: str, episode_num: str):
         """
-        查询转移记录
+        查询转移记录的条件
         """
         # 季数
         if season_num and str(season_num).isdigit():
@@ -873,45 +2770,128 @@ class MediaSyncDelEmt(_PluginBase):
         # 删除电影
         if mtype == MediaType.MOVIE:
             msg = f'电影 {media_name} {tmdb_id}'
-            transfer_history: List[TransferHistory] = self._transferhis.get_by(tmdbid=tmdb_id,
-                                                                               mtype=mtype.value,
-                                                                               dest=media_path)
+            transfer_filters = [TransferHistory.tmdbid == tmdb_id,
+                                TransferHistory.type == mtype.value]
         # 删除电视剧
         elif mtype == MediaType.TV and not season_num and not episode_num:
             msg = f'剧集 {media_name} {tmdb_id}'
-            transfer_history: List[TransferHistory] = self._transferhis.get_by(tmdbid=tmdb_id,
-                                                                               mtype=mtype.value)
+            transfer_filters = [TransferHistory.tmdbid == tmdb_id,
+                                TransferHistory.type == mtype.value]
         # 删除季 S02
         elif mtype == MediaType.TV and season_num and not episode_num:
             if not season_num or not str(season_num).isdigit():
                 logger.error(f"{media_name} 季同步删除失败，未获取到具体季")
-                return
+                return "", None
             msg = f'剧集 {media_name} S{season_num} {tmdb_id}'
             if tmdb_id and str(tmdb_id).isdigit():
                 # 根据tmdb_id查询转移记录
-                transfer_history: List[TransferHistory] = self._transferhis.get_by(tmdbid=tmdb_id,
-                                                                                   mtype=mtype.value,
-                                                                                   season=f'S{season_num}')
+                transfer_filters = [TransferHistory.tmdbid == tmdb_id,
+                                    TransferHistory.type == mtype.value,
+                                    TransferHistory.seasons == f'S{season_num}']
+            elif media_path:
+                # 兼容emby webhook不发送tmdb场景，此时路径为季目录，按前缀匹配
+                transfer_filters = [TransferHistory.type == mtype.value,
+                                    TransferHistory.seasons == f'S{season_num}',
+                                    TransferHistory.dest.like(f"{media_path}%")]
             else:
-                # 兼容emby webhook不发送tmdb场景
-                transfer_history: List[TransferHistory] = self._transferhis.get_by(mtype=mtype.value,
-                                                                                   season=f'S{season_num}',
-                                                                                   dest=media_path)
+                # 既无tmdb_id也无路径时会匹配所有剧集的该季，不处理
+                logger.error(f"{media_name} 季同步删除失败，未获取到TMDB ID及季目录")
+                return "", None
         # 删除剧集S02E02
         elif mtype == MediaType.TV and season_num and episode_num:
             if not season_num or not str(season_num).isdigit() or not episode_num or not str(episode_num).isdigit():
                 logger.error(f"{media_name} 集同步删除失败，未获取到具体集")
-                return
+                return "", None
+            if not media_path:
+                # 未获取到路径时无法区分同一集的多个版本，不处理
+                logger.error(f"{media_name} 集同步删除失败，未获取到媒体路径")
+                return "", None
             msg = f'剧集 {media_name} S{season_num}E{episode_num} {tmdb_id}'
-            transfer_history: List[TransferHistory] = self._transferhis.get_by(tmdbid=tmdb_id,
-                                                                               mtype=mtype.value,
-                                                                               season=f'S{season_num}',
-                                                                               episode=f'E{episode_num}',
-                                                                               dest=media_path)
+            transfer_filters = [TransferHistory.tmdbid == tmdb_id,
+                                TransferHistory.type == mtype.value,
+                                TransferHistory.seasons == f'S{season_num}',
+                                TransferHistory.episodes == f'E{episode_num}',
+                                TransferHistory.dest == media_path]
         else:
-            return "", []
+            return "", None
+
+        # 电影按路径区分多个版本，未获取到路径时删除该电影的全部记录
+        if media_path and mtype == MediaType.MOVIE:
+            transfer_filters.append(TransferHistory.dest == media_path)
+
+        return msg, transfer_filters
+
+    def __iter_transfer_his(self, transfer_filters: list) -> Generator[list, None, None]:
+        """
+        按主键分批读取转移记录，只查询删除所需字段，每批使用独立会话
+        """
+        columns = [getattr(TransferHistory, column) for column in self._transfer_columns]
+        last_id = 0
+        while True:
+            with SessionFactory() as db:
+                transfer_history = db.query(*columns) \
+                    .filter(*transfer_filters, TransferHistory.id > last_id) \
+                    .order_by(TransferHistory.id) \
+                    .limit(self._chunk_size) \
+                    .all()
+            if not transfer_history:
+                return
+            yield transfer_history
+            if len(transfer_history) < self._chunk_size:
+                return
+            last_id = transfer_history[-1].id
+
+    @staticmethod
+    def __delete_transfer_his(ids: List[int]):
+        """
+        批量删除转移记录并提交
+        """
+        if not ids:
+            return
+        with SessionFactory() as db:
+            db.query(TransferHistory).filter(TransferHistory.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+
+    def __build_size_index(self):
+        """
+        按转移记录的源文件、目标文件建立大小索引并关联类型、TMDB ID
+        """
+        count = 0
+        try:
+            for transfer_history in self.__iter_transfer_his([]):
+                for transferhis in transfer_history:
+                    for path in (transferhis.src, transferhis.dest):
+                        if path and self._size_index.update(path, mtype=transferhis.type,
+                                                            tmdbid=transferhis.tmdbid):
+                            count += 1
+        except Exception as e:
+            logger.error(f"大小索引建立失败：{str(e)}")
+            return
+        logger.info(f"大小索引建立完成，共 {count} 个文件")
 
-        return msg, transfer_history
+    @eventmanager.register(EventType.TransferComplete)
+    def update_inode_index(self, event: Event):
+        """
+        整理完成后增量更新硬链接索引、大小索引
+        """
+        if not self._size_index or not event or not event.event_data:
+            return
+        event_data = event.event_data
+        fileitem = event_data.get("fileitem")
+        transferinfo = event_data.get("transferinfo")
+        mediainfo = event_data.get("mediainfo")
+        tmdbid = getattr(mediainfo, "tmdb_id", None) if mediainfo else None
+        mtype = getattr(mediainfo, "type", None) if mediainfo else None
+        mtype = mtype.value if isinstance(mtype, MediaType) else mtype
+        paths = []
+        if fileitem and getattr(fileitem, "path", None):
+            paths.append(fileitem.path)
+        if transferinfo:
+            paths.extend(getattr(transferinfo, "file_list_new", None) or [])
+        for path in paths:
+            self._size_index.update(str(path), mtype=mtype, tmdbid=tmdbid)
+            if self._inode_index:
+                self._inode_index.add(str(path))
 
     def get_state(self):
         return self._enabled
@@ -921,6 +2901,9 @@ class MediaSyncDelEmt(_PluginBase):
         退出插件
         """
         try:
+            if self._delete_scheduler:
+                self._delete_scheduler.stop(drain=True)
+                self._delete_scheduler = None
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
                 if self._scheduler.running:
@@ -0,0 +1,95 @@
+"""
+基准测试：bench夹具多轮执行取中位数，与 baseline.json 对比
+
+- 运行：python -m pytest tests/bench -q
+- 更新基准：python -m pytest tests/bench -q --bench-save
+- 基准按校准负载的耗时归一化，减少不同机器之间的差异；超过 --bench-tolerance 倍时用例失败
+"""
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# 本次运行的结果：用例名 -> 中位耗时（秒）
+_results: Dict[str, float] = {}
+_calibration: Dict[str, float] = {}
+
+
+def _measure(func: Callable[[], Any], rounds: int, setup: Optional[Callable[[], Any]] = None) -> float:
+    times = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _calibrate() -> float:
+    """
+    固定的纯Python负载，用于归一化不同机器的耗时
+    """
+    if "value" not in _calibration:
+        def workload():
+            data = [{"id": i, "path": f"/media/TV/Show {i % 97}/Season {i % 7}/E{i}.mkv"} for i in range(20000)]
+            json.loads(json.dumps(data))
+            sorted(item["path"] for item in data)
+
+        _calibration["value"] = _measure(workload, rounds=5)
+    return _calibration["value"]
+
+
+@pytest.fixture
+def bench(request):
+    """
+    执行基准：bench(func, rounds=5, setup=None)，setup在每轮计时前执行
+    """
+    name = request.node.name
+    save = request.config.getoption("--bench-save")
+    tolerance = request.config.getoption("--bench-tolerance")
+
+    def run(func: Callable[[], Any], rounds: int = 5, setup: Optional[Callable[[], Any]] = None) -> float:
+        median = _measure(func, rounds=rounds, setup=setup)
+        _results[name] = median
+        if save or not BASELINE.exists():
+            return median
+        baseline = json.loads(BASELINE.read_text(encoding="utf-8"))
+        expected = baseline.get("benchmarks", {}).get(name)
+        if not expected:
+            return median
+        ratio = (median / _calibrate()) / (expected / baseline["calibration"])
+        assert ratio <= tolerance, f"{name} 耗时 {median * 1000:.2f}ms，为基准的 {ratio:.2f} 倍"
+        return median
+
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not session.config.getoption("--bench-save") or not _results:
+        return
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8")) if BASELINE.exists() else {}
+    benchmarks = baseline.get("benchmarks", {})
+    # 按本机校准耗时换算已有基准，部分更新时保持一致
+    calibration = _calibrate()
+    if baseline.get("calibration"):
+        scale = calibration / baseline["calibration"]
+        benchmarks = {name: value * scale for name, value in benchmarks.items()}
+    benchmarks.update(_results)
+    BASELINE.write_text(json.dumps({
+        "calibration": round(calibration, 6),
+        "benchmarks": {name: round(value, 6) for name, value in sorted(benchmarks.items())}
+    }, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    terminalreporter.section("benchmarks")
+    for name, value in sorted(_results.items()):
+        terminalreporter.write_line(f"{name:<50} {value * 1000:>10.3f} ms")
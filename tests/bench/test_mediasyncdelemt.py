@@ -0,0 +1,112 @@
+"""
+EMBY同步删除插件基准：路径映射、排除路径、转移记录查询条件、空目录清理、历史记录保存、详情页渲染
+"""
+import shutil
+import time
+
+import pytest
+
+from support import private
+
+LIBRARY_PATH = "\n".join(f"/emby/media{i}:/mnt/media{i}" for i in range(5))
+EXCLUDE_PATH = ",".join(f"/mnt/media{i}/exclude{i}" for i in range(10))
+
+
+def _paths(count: int):
+    return [f"/emby/media{i % 5}/TV/Show {i % 300}/Season {i % 9 + 1}/Show S{i % 9 + 1:02d}E{i % 30 + 1:02d}.mkv"
+            for i in range(count)]
+
+
+def _history_item(index: int) -> dict:
+    return {
+        "type": "电视剧",
+        "title": f"Show {index % 300}",
+        "year": "2024",
+        "path": f"/mnt/media0/TV/Show {index % 300}/Season 1/Show S01E{index % 30 + 1:02d}.mkv",
+        "season": "1",
+        "episode": str(index % 30 + 1),
+        "image": "https://image.tmdb.org/t/p/w500/poster.jpg",
+        "del_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(1700000000 + index)),
+        "unique": f"Show {index % 300}:{index}:{index}",
+        "stats": {"records": 1, "files": 2, "query_time": 0.01, "delete_time": 0.02, "total_time": 0.03,
+                  "freed_bytes": 1024 ** 3},
+        "plan": {"records": 1, "files": 2, "dirs": 1, "torrents": 1,
+                 "file_list": [f"/downloads/Show {index}.mkv", f"/mnt/media0/TV/Show {index}.mkv"],
+                 "dir_list": [f"/mnt/media0/TV/Show {index}"], "torrent_list": [f"{index:040x}"]}
+    }
+
+
+@pytest.fixture
+def plugin(make_plugin):
+    return make_plugin(library_path=LIBRARY_PATH, exclude_path=EXCLUDE_PATH, del_source=True)
+
+
+def test_map_library_path(bench, plugin):
+    map_library_path = private(plugin, "map_library_path")
+    paths = _paths(10000)
+    assert map_library_path(paths[0]).startswith("/mnt/media0/")
+    bench(lambda: [map_library_path(path) for path in paths])
+
+
+def test_is_excluded(bench, plugin):
+    is_excluded = private(plugin, "is_excluded")
+    paths = [path.replace("/emby/", "/mnt/") for path in _paths(10000)]
+    assert is_excluded("/mnt/media3/exclude3/Movie.mkv")
+    bench(lambda: [is_excluded(path) for path in paths])
+
+
+def test_get_transfer_his(bench, plugin):
+    get_transfer_his = private(plugin, "get_transfer_his")
+    cases = [
+        ("Movie", "Movie", "/mnt/media0/Movie/Movie (2024).mkv", 1001, None, None),
+        ("Series", "Show", "/mnt/media0/TV/Show", 1002, None, None),
+        ("Season", "Show", "/mnt/media0/TV/Show/Season 1", 1002, "1", None),
+        ("Season", "Show", "/mnt/media0/TV/Show/Season 1", None, "1", None),
+        ("Episode", "Show", "/mnt/media0/TV/Show/Season 1/Show S01E01.mkv", 1002, "1", "1"),
+    ]
+    for case in cases:
+        assert get_transfer_his(*case)[1]
+    bench(lambda: [get_transfer_his(*case) for _ in range(2000) for case in cases])
+
+
+def test_remove_parent_dir(bench, plugin, tmp_path):
+    remove_parent_dir = private(plugin, "remove_parent_dir")
+    root = tmp_path / "library"
+    leaves = []
+
+    def setup():
+        shutil.rmtree(root, ignore_errors=True)
+        leaves.clear()
+        # 200部剧，每部3季，目录深度6，季目录下只剩元数据文件
+        for show in range(200):
+            for season in range(1, 4):
+                season_dir = root / "TV" / "Chinese" / f"Show {show}" / "Specials" / f"Season {season}"
+                season_dir.mkdir(parents=True, exist_ok=True)
+                (season_dir / "season.nfo").write_text("nfo")
+                leaves.append(season_dir / f"Show S{season:02d}E01.mkv")
+
+    def run():
+        for leaf in leaves:
+            remove_parent_dir(leaf)
+
+    bench(run, rounds=3, setup=setup)
+    assert not (root / "TV" / "Chinese" / "Show 0").exists()
+
+
+@pytest.mark.parametrize("size", [1000, 10000, 100000])
+def test_save_history(bench, plugin, size):
+    save_history = private(plugin, "save_history")
+    history = [_history_item(i) for i in range(size)]
+    item = _history_item(size)
+
+    bench(lambda: save_history([item]), rounds=3, setup=lambda: plugin.save_data("history", history))
+    assert len(plugin.get_data("history")) == size + 1
+
+
+@pytest.mark.parametrize("size", [1000, 10000])
+def test_get_page(bench, plugin, size):
+    plugin.save_data("history", [_history_item(i) for i in range(size)])
+    plugin.save_data("trash", [{"id": str(i), "inode": [1, i // 2], "size": 1024 ** 2} for i in range(100)])
+    page = plugin.get_page()
+    assert len(page) > 1
+    bench(plugin.get_page, rounds=3)
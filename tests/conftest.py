@@ -0,0 +1,60 @@
+"""
+测试公共配置：使用 tests/stubs 中的模拟模块替代 MoviePilot，按文件路径加载插件
+"""
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+TESTS = Path(__file__).resolve().parent
+
+sys.path.insert(0, str(TESTS / "stubs"))
+sys.path.insert(0, str(TESTS))
+# 未安装apscheduler、fastapi时使用模拟模块
+sys.path.append(str(TESTS / "stubs" / "fallback"))
+
+from support import load_plugin  # noqa: E402
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "基准测试")
+    group.addoption("--bench-save", action="store_true", default=False,
+                    help="将本次基准结果写入 tests/bench/baseline.json")
+    group.addoption("--bench-tolerance", type=float, default=3.0,
+                    help="相对基准的最大耗时倍数，超过则失败")
+
+
+@pytest.fixture
+def mediasyncdelemt():
+    """
+    插件模块，每个用例前清空模拟数据
+    """
+    from app.chain import mediaserver
+    from app.core.event import eventmanager
+    from app.db import TRANSFER_HISTORY
+    from app.db.downloadhistory_oper import DOWNLOAD_FILES
+
+    TRANSFER_HISTORY.clear()
+    DOWNLOAD_FILES.clear()
+    mediaserver.SERVERS.clear()
+    eventmanager.events.clear()
+    return load_plugin("mediasyncdelemt")
+
+
+@pytest.fixture
+def make_plugin(mediasyncdelemt):
+    """
+    按配置创建插件实例，用例结束后停止服务
+    """
+    plugins = []
+
+    def make(**config: Dict[str, Any]):
+        plugin = mediasyncdelemt.MediaSyncDelEmt()
+        plugin.init_plugin(config)
+        plugins.append(plugin)
+        return plugin
+
+    yield make
+    for plugin in plugins:
+        plugin.stop_service()
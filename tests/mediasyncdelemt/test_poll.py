@@ -0,0 +1,166 @@
+"""
+定时轮询同步删除：使用本地模拟媒体服务器
+"""
+import pytest
+
+from app.chain.mediaserver import SERVERS, FakeMediaServer
+from app.core.config import settings
+from app.db import TRANSFER_HISTORY
+from app.db.models.transferhistory import TransferHistory
+
+
+@pytest.fixture
+def library(tmp_path):
+    """
+    MoviePilot侧目录：媒体库 base/mnt/data，下载目录 base/downloads，目录层级足够深，清理空目录不会越出临时目录
+    """
+    base = tmp_path / "a" / "b" / "c"
+    files = {}
+
+    def add_file(key: str, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"media")
+        files[key] = path
+        return str(path)
+
+    movie_src = add_file("movie_src", base / "downloads" / "movie" / "Movie (2024)" / "movie.mkv")
+    movie_dest = add_file("movie_dest", base / "mnt" / "data" / "Movie" / "Movie (2024)" / "Movie (2024).mkv")
+    TRANSFER_HISTORY.append(TransferHistory(id=1, type="电影", title="Movie", year="2024", tmdbid=100,
+                                            src=movie_src, dest=movie_dest, download_hash="a" * 40))
+    for episode in range(1, 21):
+        src = add_file(f"ep{episode}_src", base / "downloads" / "tv" / "Show" / f"show.s01e{episode:02d}.mkv")
+        dest = add_file(f"ep{episode}_dest",
+                        base / "mnt" / "data" / "TV" / "Show" / "Season 1" / f"Show S01E{episode:02d}.mkv")
+        TRANSFER_HISTORY.append(TransferHistory(id=1 + episode, type="电视剧", title="Show", year="2024",
+                                                tmdbid=200, seasons="S01", episodes=f"E{episode:02d}",
+                                                src=src, dest=dest, download_hash="b" * 40))
+
+    server = FakeMediaServer()
+    server.add_movie("movies", "m1", "Movie", 100, "/data/Movie/Movie (2024)/Movie (2024).mkv")
+    server.add_series("tv", "s1", "Show", 200, "/data/TV/Show", {1: list(range(1, 21))})
+    SERVERS["emby"] = server
+    # 媒体服务器路径 /data 映射为 MoviePilot 路径，目标路径本身包含 /data
+    return server, files, f"/data:{base}/mnt/data"
+
+
+@pytest.fixture
+def poll_plugin(make_plugin, library):
+    def make(**config):
+        _, _, library_path = library
+        plugin = make_plugin(enabled=True, sync_type="poll", del_source=True,
+                             library_path=library_path, **config)
+        # 同步执行删除，便于断言
+        plugin._delete_scheduler.stop()
+        plugin._delete_scheduler = None
+        return plugin
+
+    return make
+
+
+def _record_ids():
+    return sorted(row.id for row in TRANSFER_HISTORY)
+
+
+def test_first_poll_saves_compact_snapshot(poll_plugin):
+    plugin = poll_plugin()
+    plugin.poll_library()
+    snapshot = plugin.get_data("snapshot")
+    assert len(snapshot) == 2
+    values = sorted(snapshot.values(), key=lambda value: value[0])
+    assert values[0] == [100, "Movie", "/data/Movie/Movie (2024)/Movie (2024).mkv", None]
+    assert values[1] == [200, "Show", "/data/TV/Show", [1000 + episode for episode in range(1, 21)]]
+    assert all(len(key) == 16 for key in snapshot)
+    assert _record_ids() == list(range(1, 22))
+
+
+def test_removed_movie_is_deleted(poll_plugin, library):
+    server, files, _ = library
+    plugin = poll_plugin()
+    plugin.poll_library()
+    # Emby删除电影：媒体文件已被删除，媒体项消失
+    server.remove("m1")
+    files["movie_dest"].unlink()
+    plugin.poll_library()
+    assert 1 not in _record_ids()
+    assert not files["movie_src"].exists()
+    assert files["ep1_dest"].exists()
+
+
+def test_removed_episode_is_not_mapped_twice(poll_plugin, library):
+    server, files, _ = library
+    plugin = poll_plugin()
+    plugin.poll_library()
+    server.seasons["s1"][1].remove(2)
+    files["ep2_dest"].unlink()
+    plugin.poll_library()
+    # 单集目的路径取自转移记录，不再经过路径映射
+    assert _record_ids() == [1, 2] + list(range(4, 22))
+    assert not files["ep2_src"].exists()
+    assert files["ep1_src"].exists()
+    assert plugin.get_data("snapshot")
+
+
+def test_removed_episode_excluded_by_emby_path(poll_plugin, library):
+    server, files, _ = library
+    plugin = poll_plugin(exclude_path="/data/TV")
+    plugin.poll_library()
+    server.seasons["s1"][1].remove(2)
+    files["ep2_dest"].unlink()
+    plugin.poll_library()
+    assert _record_ids() == list(range(1, 22))
+    assert files["ep2_src"].exists()
+
+
+def test_mass_removal_confirmed_after_consecutive_polls(poll_plugin, library):
+    server, files, _ = library
+    plugin = poll_plugin()
+    plugin.poll_library()
+    baseline = plugin.get_data("snapshot")
+    # 一次移除20集，超过20%，疑似媒体库异常
+    server.seasons["s1"][1].clear()
+    for run in range(1, plugin._poll_confirm_runs):
+        plugin.poll_library()
+        assert plugin.get_data("snapshot") == baseline
+        assert plugin.get_data("poll_pending")["count"] == run
+    plugin.poll_library()
+    # 连续多次移除相同媒体后接受为新快照，不同步删除
+    snapshot = plugin.get_data("snapshot")
+    assert snapshot != baseline
+    assert [value[3] for value in snapshot.values() if value[0] == 200] == [[]]
+    assert plugin.get_data("poll_pending") is None
+    assert _record_ids() == list(range(1, 22))
+    assert all(path.exists() for path in files.values())
+
+
+def test_mass_removal_counter_resets_when_removals_change(poll_plugin, library):
+    server, _, _ = library
+    plugin = poll_plugin()
+    plugin.poll_library()
+    server.seasons["s1"][1][:] = [20]
+    plugin.poll_library()
+    server.seasons["s1"][1][:] = []
+    plugin.poll_library()
+    assert plugin.get_data("poll_pending")["count"] == 1
+
+
+def test_poll_baseline_api(poll_plugin, library):
+    server, _, _ = library
+    plugin = poll_plugin()
+    plugin.poll_library()
+    server.seasons["s1"][1].clear()
+    plugin.poll_library()
+    assert not plugin.poll_baseline(apikey="wrong").success
+    assert plugin.poll_baseline(apikey=settings.API_TOKEN).success
+    assert plugin.get_data("poll_pending") is None
+    snapshot = plugin.get_data("snapshot")
+    plugin.poll_library()
+    assert plugin.get_data("snapshot") == snapshot
+    assert _record_ids() == list(range(1, 22))
+
+
+def test_old_snapshot_format_rebuilt(poll_plugin):
+    plugin = poll_plugin()
+    plugin.save_data("snapshot", {"abc": ["Movie", "Movie", 100, None, None, "/data/Movie.mkv"]})
+    plugin.poll_library()
+    assert all(len(value) == 4 for value in plugin.get_data("snapshot").values())
+    assert _record_ids() == list(range(1, 22))
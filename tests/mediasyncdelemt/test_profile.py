@@ -0,0 +1,41 @@
+"""
+性能分析：按次数记录pstats与collapsed，按阈值只采样
+"""
+import time
+
+from app.core.config import settings
+from support import private
+
+
+def _run(plugin, monkeypatch, duration: float):
+    monkeypatch.setattr(plugin, "_MediaSyncDelEmt__sync_del_media", lambda **kwargs: time.sleep(duration))
+    private(plugin, "profile_sync_del")({})
+
+
+def _files(plugin):
+    return sorted(f.suffix for f in private(plugin, "get_profile_path")().iterdir())
+
+
+def test_profile_count_saves_pstats(make_plugin, monkeypatch):
+    plugin = make_plugin()
+    plugin.profile(apikey=settings.API_TOKEN, count=1)
+    _run(plugin, monkeypatch, 0.05)
+    assert _files(plugin) == [".collapsed", ".pstats"]
+    assert plugin._profile_count == 0
+
+
+def test_profile_threshold_samples_only(make_plugin, mediasyncdelemt, monkeypatch):
+    plugin = make_plugin()
+    plugin.profile(apikey=settings.API_TOKEN, threshold=10)
+    monkeypatch.setattr(mediasyncdelemt.cProfile, "Profile", None)
+    _run(plugin, monkeypatch, 0.05)
+    assert _files(plugin) == [".collapsed"]
+
+
+def test_profile_skips_empty_collapsed(make_plugin, mediasyncdelemt, monkeypatch):
+    plugin = make_plugin()
+    plugin.profile(apikey=settings.API_TOKEN, count=1)
+    # 耗时短于采样间隔，没有采样数据
+    monkeypatch.setattr(mediasyncdelemt.SamplingProfiler, "collapsed", lambda self: "")
+    _run(plugin, monkeypatch, 0)
+    assert _files(plugin) == [".pstats"]
@@ -0,0 +1,50 @@
+"""
+清理空目录：并行删除时目录可能已被其他任务清理
+"""
+import shutil
+
+from support import private
+
+
+def _season(tmp_path):
+    season_dir = tmp_path / "a" / "b" / "c" / "TV" / "Show" / "Season 1"
+    season_dir.mkdir(parents=True)
+    (season_dir / "season.nfo").write_text("nfo")
+    return season_dir
+
+
+def test_remove_parent_dir(make_plugin, tmp_path):
+    plugin = make_plugin()
+    season_dir = _season(tmp_path)
+    private(plugin, "remove_parent_dir")(season_dir / "Show S01E01.mkv")
+    assert not season_dir.parent.exists()
+    assert (tmp_path / "a" / "b" / "c").exists()
+
+
+def test_remove_parent_dir_removed_concurrently(make_plugin, mediasyncdelemt, tmp_path, monkeypatch):
+    plugin = make_plugin()
+    season_dir = _season(tmp_path)
+    rmtree = shutil.rmtree
+
+    def racing_rmtree(path, *args, **kwargs):
+        # 其他任务先一步删除了该目录
+        rmtree(path)
+        rmtree(path, *args, **kwargs)
+
+    monkeypatch.setattr(mediasyncdelemt.shutil, "rmtree", racing_rmtree)
+    private(plugin, "remove_parent_dir")(season_dir / "Show S01E01.mkv")
+    assert not season_dir.parent.exists()
+
+
+def test_remove_parent_dir_trash_removed_concurrently(make_plugin, mediasyncdelemt, tmp_path, monkeypatch):
+    plugin = make_plugin(trash_mode=True)
+    season_dir = _season(tmp_path)
+    rename = mediasyncdelemt.os.rename
+
+    def racing_rename(src, dst):
+        shutil.rmtree(src)
+        rename(src, dst)
+
+    monkeypatch.setattr(mediasyncdelemt.os, "rename", racing_rename)
+    private(plugin, "remove_parent_dir")(season_dir / "Show S01E01.mkv")
+    assert not season_dir.parent.exists()
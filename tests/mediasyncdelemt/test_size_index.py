@@ -0,0 +1,44 @@
+"""
+大小索引：按(类型, TMDB ID)聚合，硬链接只计算一次
+"""
+import os
+
+
+def _write(path, size: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_show_size_separates_movie_and_tv(mediasyncdelemt, tmp_path):
+    index = mediasyncdelemt.SizeIndex()
+    movie = _write(tmp_path / "movie.mkv", 100)
+    episode = _write(tmp_path / "show" / "e01.mkv", 10)
+    index.update(movie, mtype="电影", tmdbid=1399)
+    index.update(episode, mtype="电视剧", tmdbid="1399")
+    assert index.show_size("电视剧", 1399) == 10
+    assert index.show_size("电影", 1399) == 100
+    assert index.show_size(None, 1399) == 0
+
+
+def test_show_size_counts_hardlinks_once(mediasyncdelemt, tmp_path):
+    index = mediasyncdelemt.SizeIndex()
+    src = _write(tmp_path / "downloads" / "e01.mkv", 10)
+    dest = str(tmp_path / "library" / "e01.mkv")
+    os.makedirs(os.path.dirname(dest))
+    os.link(src, dest)
+    for path in (src, dest):
+        index.update(path, mtype="电视剧", tmdbid=1399)
+    assert index.show_size("电视剧", 1399) == 10
+    index.remove(src)
+    index.remove(dest)
+    assert index.show_size("电视剧", 1399) == 0
+
+
+def test_owner_change_moves_path(mediasyncdelemt, tmp_path):
+    index = mediasyncdelemt.SizeIndex()
+    path = _write(tmp_path / "e01.mkv", 10)
+    index.update(path, mtype="电影", tmdbid=1)
+    index.get(path, mtype="电视剧", tmdbid=1)
+    assert index.show_size("电影", 1) == 0
+    assert index.show_size("电视剧", 1) == 10
@@ -0,0 +1,23 @@
+"""
+同步删除统计：只计入实际删除的转移记录
+"""
+from app.db import TRANSFER_HISTORY
+from app.db.models.transferhistory import TransferHistory
+from support import private
+
+
+def test_record_count_excludes_guarded_rows(make_plugin, tmp_path):
+    season_dir = tmp_path / "a" / "b" / "c" / "library" / "Show" / "Season 1"
+    for episode, title in ((1, "Show"), (2, "Show"), (3, "Other")):
+        # 媒体库文件已被Emby删除，标题不符的记录被防误删跳过
+        TRANSFER_HISTORY.append(TransferHistory(id=episode, type="电视剧", title=title, year="2024",
+                                                tmdbid=200, seasons="S01", episodes=f"E{episode:02d}",
+                                                dest=str(season_dir / f"Show S01E{episode:02d}.mkv")))
+    plugin = make_plugin(enabled=True, notify=True)
+    private(plugin, "sync_del_media")(media_type="Series", media_name="Show", media_path=str(season_dir),
+                                      tmdb_id=200, season_num="1", episode_num=None)
+    assert [row.id for row in TRANSFER_HISTORY] == [3]
+    history = plugin.get_data("history")
+    assert history[-1]["stats"]["records"] == 2
+    assert history[-1]["plan"]["records"] == 2
+    assert "删除记录2个" in plugin.messages[-1]["text"]
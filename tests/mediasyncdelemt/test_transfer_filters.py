@@ -0,0 +1,53 @@
+"""
+转移记录查询条件：与MoviePilot TransferHistoryOper.get_by的匹配范围一致
+"""
+import pytest
+
+from app.db import SessionFactory, TRANSFER_HISTORY
+from app.db.models.transferhistory import TransferHistory
+from support import private
+
+
+@pytest.fixture
+def records(mediasyncdelemt):
+    for record_id, title, tmdbid, season, episode, dest in [
+        (1, "ShowA", 1, "S02", "E01", "/lib/ShowA/Season 2/ShowA S02E01.mkv"),
+        (2, "ShowB", 2, "S02", "E01", "/lib/ShowB/Season 2/ShowB S02E01.mkv"),
+        (3, "ShowB", 2, "S02", "E01", "/lib/ShowB/Season 2/ShowB S02E01 - 2160p.mkv"),
+        (4, "ShowB", 2, "S02", "E02", "/lib/ShowB/Season 2/ShowB S02E02.mkv"),
+    ]:
+        TRANSFER_HISTORY.append(TransferHistory(id=record_id, type="电视剧", title=title, tmdbid=tmdbid,
+                                                seasons=season, episodes=episode, dest=dest))
+
+
+def _match(plugin, **kwargs):
+    msg, transfer_filters = private(plugin, "get_transfer_his")(**kwargs)
+    if transfer_filters is None:
+        return None
+    with SessionFactory() as db:
+        return sorted(row.id for row in db.query(TransferHistory.id).filter(*transfer_filters).all())
+
+
+def test_season_without_tmdb_matches_season_dir(make_plugin, records):
+    plugin = make_plugin()
+    assert _match(plugin, media_type="Season", media_name="ShowB", media_path="/lib/ShowB/Season 2",
+                  tmdb_id=None, season_num="2", episode_num=None) == [2, 3, 4]
+
+
+def test_season_without_tmdb_or_path_rejected(make_plugin, records):
+    plugin = make_plugin()
+    assert _match(plugin, media_type="Season", media_name="ShowB", media_path=None,
+                  tmdb_id=None, season_num="2", episode_num=None) is None
+
+
+def test_episode_matches_path(make_plugin, records):
+    plugin = make_plugin()
+    assert _match(plugin, media_type="Episode", media_name="ShowB",
+                  media_path="/lib/ShowB/Season 2/ShowB S02E01.mkv",
+                  tmdb_id=2, season_num="2", episode_num="1") == [2]
+
+
+def test_episode_without_path_rejected(make_plugin, records):
+    plugin = make_plugin()
+    assert _match(plugin, media_type="Episode", media_name="ShowB", media_path=None,
+                  tmdb_id=2, season_num="2", episode_num="1") is None
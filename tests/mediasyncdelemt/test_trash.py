@@ -0,0 +1,44 @@
+"""
+回收站模式：同步删除结束后统一写入回收站记录
+"""
+import os
+
+from app.db import TRANSFER_HISTORY
+from app.db.models.transferhistory import TransferHistory
+from support import private
+
+
+def test_trash_saved_once_per_deletion(make_plugin, tmp_path, monkeypatch):
+    base = tmp_path / "a" / "b" / "c"
+    season_dir = base / "library" / "Show" / "Season 1"
+    download_dir = base / "downloads" / "Show"
+    download_dir.mkdir(parents=True)
+    for episode in range(1, 6):
+        src = download_dir / f"show.s01e{episode:02d}.mkv"
+        src.write_bytes(b"media")
+        # 媒体库文件已被Emby删除
+        TRANSFER_HISTORY.append(TransferHistory(id=episode, type="电视剧", title="Show", year="2024",
+                                                tmdbid=200, seasons="S01", episodes=f"E{episode:02d}",
+                                                src=str(src), dest=str(season_dir / f"Show S01E{episode:02d}.mkv"),
+                                                download_hash="b" * 40))
+    plugin = make_plugin(enabled=True, del_source=True, trash_mode=True)
+    trash_dir = tmp_path / "trash"
+    trash_dir.mkdir()
+    plugin._trash_dirs = {os.lstat(tmp_path).st_dev: trash_dir}
+    saves = []
+    save_data = plugin.save_data
+
+    def counting_save(key, value):
+        if key == "trash":
+            saves.append(len(value))
+        save_data(key, value)
+
+    monkeypatch.setattr(plugin, "save_data", counting_save)
+    private(plugin, "sync_del_media")(media_type="Series", media_name="Show", media_path=str(season_dir),
+                                      tmdb_id=200, season_num="1", episode_num=None)
+    assert not TRANSFER_HISTORY
+    assert not any(download_dir.glob("*.mkv"))
+    # 5个文件及清理的3级空目录，只写入一次
+    assert saves == [8]
+    paths = {item["path"] for item in plugin.get_data("trash")}
+    assert {str(download_dir / f"show.s01e{episode:02d}.mkv") for episode in range(1, 6)} < paths
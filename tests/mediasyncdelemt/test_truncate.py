@@ -0,0 +1,92 @@
+"""
+大文件分步截断：使用临时目录中的稀疏文件，不占用实际磁盘空间
+"""
+import os
+
+import pytest
+
+from support import private
+
+GIB = 1024 ** 3
+MIB = 1024 ** 2
+
+
+def _sparse_file(path, size: int):
+    with open(path, "wb") as f:
+        f.truncate(size)
+    return path
+
+
+def test_truncate_file_to_zero(mediasyncdelemt, tmp_path):
+    file_path = _sparse_file(tmp_path / "movie.mkv", 3 * GIB + 123)
+    assert mediasyncdelemt.truncate_file(file_path) == 3 * GIB + 123
+    assert file_path.exists()
+    assert file_path.stat().st_size == 0
+
+
+def test_truncate_file_steps_and_rate(mediasyncdelemt, tmp_path, monkeypatch):
+    file_path = _sparse_file(tmp_path / "movie.mkv", 512 * MIB)
+    sizes, sleeps = [], []
+    ftruncate = os.ftruncate
+
+    def record_ftruncate(fd, length):
+        sizes.append(length)
+        ftruncate(fd, length)
+
+    monkeypatch.setattr(mediasyncdelemt.os, "ftruncate", record_ftruncate)
+    monkeypatch.setattr(mediasyncdelemt.time, "sleep", sleeps.append)
+    mediasyncdelemt.truncate_file(file_path, rate=128 * MIB)
+    # 每秒截断rate字节，最后一步后不再休眠
+    assert sizes == [384 * MIB, 256 * MIB, 128 * MIB, 0]
+    assert len(sleeps) == 3
+    assert sum(sleeps) == pytest.approx(3, abs=0.1)
+
+
+def test_truncate_file_minimum_step(mediasyncdelemt, tmp_path, monkeypatch):
+    file_path = _sparse_file(tmp_path / "movie.mkv", 256 * MIB)
+    sizes = []
+    ftruncate = os.ftruncate
+
+    def record_ftruncate(fd, length):
+        sizes.append(length)
+        ftruncate(fd, length)
+
+    monkeypatch.setattr(mediasyncdelemt.os, "ftruncate", record_ftruncate)
+    monkeypatch.setattr(mediasyncdelemt.time, "sleep", lambda seconds: None)
+    # 限速过低时每步至少截断64MiB
+    mediasyncdelemt.truncate_file(file_path, rate=MIB)
+    assert sizes == [192 * MIB, 128 * MIB, 64 * MIB, 0]
+
+
+def test_unlink_truncates_large_files(make_plugin, tmp_path):
+    plugin = make_plugin(truncate_size=0.25)
+    unlink = private(plugin, "unlink")
+    plugin._deletion_stats.values = {}
+    file_path = _sparse_file(tmp_path / "movie.mkv", 512 * MIB)
+    assert unlink(file_path) == 512 * MIB
+    assert not file_path.exists()
+    assert plugin._deletion_stats.values["truncated_files"] == 1
+    assert plugin._deletion_stats.values["truncated_bytes"] == 512 * MIB
+
+
+def test_unlink_keeps_hardlinked_data(make_plugin, tmp_path):
+    plugin = make_plugin(truncate_size=0.25)
+    unlink = private(plugin, "unlink")
+    plugin._deletion_stats.values = {}
+    file_path = _sparse_file(tmp_path / "movie.mkv", 512 * MIB)
+    link_path = tmp_path / "link.mkv"
+    os.link(file_path, link_path)
+    # 存在其他硬链接时截断会破坏其他链接的数据，直接删除
+    assert unlink(file_path) == 0
+    assert not file_path.exists()
+    assert link_path.stat().st_size == 512 * MIB
+    assert "truncated_files" not in plugin._deletion_stats.values
+
+
+def test_unlink_small_files_directly(make_plugin, tmp_path):
+    plugin = make_plugin(truncate_size=1)
+    unlink = private(plugin, "unlink")
+    plugin._deletion_stats.values = {}
+    file_path = _sparse_file(tmp_path / "movie.mkv", 512 * MIB)
+    assert unlink(file_path) == 0
+    assert not file_path.exists()
@@ -0,0 +1,3 @@
+class ChainBase:
+    def obtain_specific_image(self, *args, **kwargs):
+        return None
@@ -0,0 +1,68 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.chain import ChainBase
+
+
+@dataclass
+class MediaServerLibrary:
+    id: str
+    name: str = ""
+
+
+@dataclass
+class MediaServerItem:
+    item_id: str
+    item_type: str
+    title: str
+    tmdbid: Optional[int] = None
+    path: Optional[str] = None
+
+
+@dataclass
+class MediaServerSeasonInfo:
+    season: int
+    episodes: List[int] = field(default_factory=list)
+
+
+class FakeMediaServer:
+    """
+    本地模拟媒体服务器：媒体库ID -> 媒体项，剧集ID -> {季: [集]}
+    """
+
+    def __init__(self):
+        self.libraries: Dict[str, List[MediaServerItem]] = {}
+        self.seasons: Dict[str, Dict[int, List[int]]] = {}
+
+    def add_movie(self, library_id: str, item_id: str, title: str, tmdbid: int, path: str):
+        self.libraries.setdefault(library_id, []).append(
+            MediaServerItem(item_id=item_id, item_type="Movie", title=title, tmdbid=tmdbid, path=path))
+
+    def add_series(self, library_id: str, item_id: str, title: str, tmdbid: int, path: str,
+                   seasons: Dict[int, List[int]]):
+        self.libraries.setdefault(library_id, []).append(
+            MediaServerItem(item_id=item_id, item_type="Series", title=title, tmdbid=tmdbid, path=path))
+        self.seasons[item_id] = {season: list(episodes) for season, episodes in seasons.items()}
+
+    def remove(self, item_id: str):
+        for items in self.libraries.values():
+            items[:] = [item for item in items if item.item_id != item_id]
+        self.seasons.pop(item_id, None)
+
+
+# 服务器名称 -> 模拟媒体服务器
+SERVERS: Dict[str, FakeMediaServer] = {}
+
+
+class MediaServerChain(ChainBase):
+
+    def librarys(self, server: str) -> List[MediaServerLibrary]:
+        return [MediaServerLibrary(id=library_id) for library_id in SERVERS[server].libraries]
+
+    def items(self, server: str, library_id: Any) -> List[MediaServerItem]:
+        return list(SERVERS[server].libraries.get(library_id) or [])
+
+    def episodes(self, server: str, item_id: Any) -> List[MediaServerSeasonInfo]:
+        seasons = SERVERS[server].seasons.get(item_id) or {}
+        return [MediaServerSeasonInfo(season=season, episodes=list(episodes))
+                for season, episodes in seasons.items()]
@@ -0,0 +1,5 @@
+from app.chain import ChainBase
+
+
+class TransferChain(ChainBase):
+    pass
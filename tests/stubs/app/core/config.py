@@ -0,0 +1,8 @@
+class Settings:
+    API_TOKEN = "moviepilot"
+    TMDB_IMAGE_DOMAIN = "image.tmdb.org"
+    RMT_MEDIAEXT = [".mp4", ".mkv", ".ts", ".iso", ".rmvb", ".avi", ".mov", ".mpeg", ".mpg", ".wmv",
+                    ".3gp", ".asf", ".m4v", ".flv", ".m2ts", ".strm", ".tp", ".f4v"]
+
+
+settings = Settings()
@@ -0,0 +1,25 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Event:
+    def __init__(self, event_type: Any, event_data: Optional[dict] = None):
+        self.event_type = event_type
+        self.event_data = event_data or {}
+
+
+class EventManager:
+    def __init__(self):
+        # 已发送的事件，便于测试断言
+        self.events: List[Tuple[Any, Dict[str, Any]]] = []
+
+    def register(self, etype: Any):
+        def decorator(func):
+            return func
+
+        return decorator
+
+    def send_event(self, etype: Any, data: dict = None):
+        self.events.append((etype, data or {}))
+
+
+eventmanager = EventManager()
@@ -0,0 +1,104 @@
+"""
+内存中的转移记录表，支持插件使用的查询：filter / order_by / limit / all / delete
+"""
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+
+class Expression:
+
+    def __init__(self, func: Callable[[Any], bool], text: str):
+        self.func = func
+        self.text = text
+
+    def __call__(self, row: Any) -> bool:
+        return self.func(row)
+
+    def __repr__(self):
+        return self.text
+
+
+class Column:
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __eq__(self, other) -> Expression:
+        return Expression(lambda row: getattr(row, self.name) == other, f"{self.name} == {other!r}")
+
+    def __gt__(self, other) -> Expression:
+        return Expression(lambda row: getattr(row, self.name) > other, f"{self.name} > {other!r}")
+
+    def like(self, pattern: str) -> Expression:
+        prefix = pattern.rstrip("%")
+        return Expression(lambda row: str(getattr(row, self.name) or "").startswith(prefix),
+                          f"{self.name} LIKE {pattern!r}")
+
+    def in_(self, values) -> Expression:
+        values = set(values)
+        return Expression(lambda row: getattr(row, self.name) in values, f"{self.name} IN {sorted(values)!r}")
+
+    __hash__ = object.__hash__
+
+
+class Query:
+
+    def __init__(self, table: List[Any], columns: tuple):
+        self._table = table
+        # 查询实体时columns为模型类
+        self._columns = [c for c in columns if isinstance(c, Column)]
+        self._filters: List[Expression] = []
+        self._order = None
+        self._limit = None
+
+    def filter(self, *expressions: Expression) -> "Query":
+        self._filters.extend(expressions)
+        return self
+
+    def order_by(self, column: Column) -> "Query":
+        self._order = column
+        return self
+
+    def limit(self, limit: int) -> "Query":
+        self._limit = limit
+        return self
+
+    def __rows(self) -> List[Any]:
+        rows = [row for row in self._table if all(f(row) for f in self._filters)]
+        if self._order is not None:
+            rows.sort(key=lambda row: getattr(row, self._order.name))
+        return rows[:self._limit] if self._limit is not None else rows
+
+    def all(self) -> List[Any]:
+        rows = self.__rows()
+        if not self._columns:
+            return rows
+        return [SimpleNamespace(**{c.name: getattr(row, c.name) for c in self._columns}) for row in rows]
+
+    def delete(self, synchronize_session: Any = None) -> int:
+        rows = {id(row) for row in self.__rows()}
+        self._table[:] = [row for row in self._table if id(row) not in rows]
+        return len(rows)
+
+
+# 转移记录表
+TRANSFER_HISTORY: List[Any] = []
+
+
+class Session:
+
+    def query(self, *columns) -> Query:
+        return Query(TRANSFER_HISTORY, columns)
+
+    def commit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+def SessionFactory() -> Session:
+    return Session()
@@ -0,0 +1,14 @@
+from types import SimpleNamespace
+from typing import Dict
+
+# 下载文件完整路径 -> 种子hash
+DOWNLOAD_FILES: Dict[str, str] = {}
+
+
+class DownloadHistoryOper:
+
+    def get_file_by_fullpath(self, fullpath: str):
+        download_hash = DOWNLOAD_FILES.get(fullpath)
+        if not download_hash:
+            return None
+        return SimpleNamespace(fullpath=fullpath, download_hash=download_hash)
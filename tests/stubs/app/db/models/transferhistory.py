@@ -0,0 +1,18 @@
+from app.db import Column
+
+_COLUMNS = ("id", "src", "dest", "mode", "type", "category", "title", "year", "tmdbid", "imdbid", "tvdbid",
+            "doubanid", "seasons", "episodes", "image", "download_hash", "status", "date")
+
+
+class TransferHistory:
+    """
+    转移记录，类属性为可比较的列，实例属性为字段值
+    """
+
+    def __init__(self, **kwargs):
+        for name in _COLUMNS:
+            setattr(self, name, kwargs.get(name))
+
+
+for _name in _COLUMNS:
+    setattr(TransferHistory, _name, Column(_name))
@@ -0,0 +1,21 @@
+from app.db import TRANSFER_HISTORY
+
+
+class TransferHistoryOper:
+
+    def get_by(self, title: str = None, year: str = None, mtype: str = None, season: str = None,
+               episode: str = None, tmdbid: int = None, dest: str = None):
+        def match(row) -> bool:
+            if tmdbid and row.tmdbid != tmdbid:
+                return False
+            if mtype and row.type != mtype:
+                return False
+            if season and row.seasons != season:
+                return False
+            if episode and row.episodes != episode:
+                return False
+            if dest and not str(row.dest or "").startswith(dest):
+                return False
+            return True
+
+        return [row for row in TRANSFER_HISTORY if match(row)]
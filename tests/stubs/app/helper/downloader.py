@@ -0,0 +1,4 @@
+class DownloaderHelper:
+
+    def get_services(self, *args, **kwargs) -> dict:
+        return {}
@@ -0,0 +1,7 @@
+from app.chain import mediaserver
+
+
+class MediaServerHelper:
+
+    def get_services(self, type_filter: str = None, *args, **kwargs) -> dict:
+        return {name: server for name, server in mediaserver.SERVERS.items()}
@@ -0,0 +1,5 @@
+import logging
+
+logger = logging.getLogger("moviepilot")
+# MoviePilot的logger提供warn
+logger.warn = logger.warning
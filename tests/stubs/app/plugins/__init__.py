@@ -0,0 +1,44 @@
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.chain import ChainBase
+from app.core.event import eventmanager
+
+
+class _PluginBase:
+    """
+    插件基类，数据按JSON序列化后保存在内存中，与MoviePilot写入数据库的开销相近
+    """
+
+    def __init__(self):
+        self.chain = ChainBase()
+        self.eventmanager = eventmanager
+        self._plugin_data: Dict[str, str] = {}
+        self._plugin_config: Dict[str, Any] = {}
+        self._data_path = Path(tempfile.mkdtemp(prefix="moviepilot-plugin-"))
+        # 已发送的消息，便于测试断言
+        self.messages: List[Dict[str, Any]] = []
+
+    def get_data(self, key: str = None) -> Any:
+        value = self._plugin_data.get(key)
+        return json.loads(value) if value is not None else None
+
+    def save_data(self, key: str, value: Any):
+        self._plugin_data[key] = json.dumps(value, ensure_ascii=False)
+
+    def del_data(self, key: str = None):
+        self._plugin_data.pop(key, None)
+
+    def update_config(self, config: dict):
+        self._plugin_config = dict(config)
+
+    def get_config(self) -> dict:
+        return self._plugin_config
+
+    def get_data_path(self) -> Path:
+        return self._data_path
+
+    def post_message(self, **kwargs):
+        self.messages.append(kwargs)
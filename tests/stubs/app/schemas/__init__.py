@@ -0,0 +1,13 @@
+from typing import Any, Optional
+
+from app.schemas import types
+
+
+class Response:
+    def __init__(self, success: bool = False, message: Optional[str] = None, data: Any = None):
+        self.success = success
+        self.message = message
+        self.data = data if data is not None else {}
+
+
+__all__ = ["Response", "types"]
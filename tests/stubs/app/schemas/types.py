@@ -0,0 +1,23 @@
+from enum import Enum
+
+
+class MediaType(Enum):
+    MOVIE = "电影"
+    TV = "电视剧"
+    UNKNOWN = "未知"
+
+
+class EventType(Enum):
+    PluginAction = "plugin.action"
+    WebhookMessage = "webhook.message"
+    TransferComplete = "transfer.complete"
+    DownloadFileDeleted = "downloadfile.deleted"
+
+
+class NotificationType(Enum):
+    Plugin = "插件"
+
+
+class MediaImageType(Enum):
+    Poster = "poster"
+    Backdrop = "backdrop"
@@ -0,0 +1,9 @@
+class StringUtils:
+
+    @staticmethod
+    def str_filesize(size: int, pre: int = 2) -> str:
+        size = float(size or 0)
+        for unit in ["B", "K", "M", "G", "T"]:
+            if size < 1024 or unit == "T":
+                return f"{round(size, pre)}{unit}" if unit != "B" else f"{int(size)}B"
+            size /= 1024
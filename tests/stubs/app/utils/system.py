@@ -0,0 +1,22 @@
+from pathlib import Path
+
+
+class SystemUtils:
+
+    @staticmethod
+    def exits_files(directory: Path, extensions: list, min_filesize: int = 0, recursive: bool = True) -> bool:
+        """
+        判断目录下是否存在指定扩展名的文件
+        """
+        directory = Path(directory)
+        if not directory.exists():
+            return False
+        if directory.is_file():
+            return True
+        extensions = {ext.lower() for ext in extensions}
+        files = directory.rglob("*") if recursive else directory.glob("*")
+        for path in files:
+            if path.is_file() and path.suffix.lower() in extensions \
+                    and path.stat().st_size >= (min_filesize or 0) * 1024 * 1024:
+                return True
+        return False
@@ -0,0 +1,10 @@
+class BackgroundScheduler:
+
+    def __init__(self, *args, **kwargs):
+        self.running = False
+
+    def remove_all_jobs(self):
+        pass
+
+    def shutdown(self, *args, **kwargs):
+        self.running = False
@@ -0,0 +1,8 @@
+class CronTrigger:
+
+    def __init__(self, expr: str = None):
+        self.expr = expr
+
+    @classmethod
+    def from_crontab(cls, expr: str, timezone=None) -> "CronTrigger":
+        return cls(expr)
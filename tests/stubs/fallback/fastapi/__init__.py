@@ -0,0 +1,2 @@
+def Body(default=None, *args, **kwargs):
+    return default
@@ -0,0 +1,12 @@
+class FileResponse:
+
+    def __init__(self, path, filename: str = None, **kwargs):
+        self.path = path
+        self.filename = filename
+
+
+class StreamingResponse:
+
+    def __init__(self, content, media_type: str = None, **kwargs):
+        self.body_iterator = content
+        self.media_type = media_type
@@ -0,0 +1,32 @@
+"""
+测试辅助：按文件路径加载插件、访问私有方法
+"""
+import importlib.util
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_plugin(name: str):
+    """
+    按目录名加载plugins.v2下的插件
+    """
+    module_name = f"plugins_v2_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    plugin_dir = ROOT / "plugins.v2" / name
+    spec = importlib.util.spec_from_file_location(module_name, plugin_dir / "__init__.py",
+                                                  submodule_search_locations=[str(plugin_dir)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def private(obj: Any, name: str) -> Callable:
+    """
+    获取插件的双下划线私有方法
+    """
+    return getattr(obj, f"_{type(obj).__name__}__{name}")